@@ -0,0 +1,263 @@
+import csv
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+# the matchers live in separate question folders
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "q1"))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "q2"))
+
+from stricterBM import CompiledPattern
+from bitwisepm import bitwise_search
+from horspool import horspool_search
+
+
+TEXT_LENGTHS = (10 ** 4, 10 ** 5)
+PATTERN_LENGTHS = (4, 16, 64)
+# grids behind the find_all thresholds, one for the short patterns every engine can run, one for the long patterns
+# only the skipping engines can, as bitwise_pm's bitvectors and the naive search grow with the pattern. The long
+# grid leaves out the repetitive text, where stricter_bm is O(nm) and a single run at n = 10^6 takes hours
+THRESHOLD_TEXT_LENGTHS = (10 ** 5, 10 ** 6)
+THRESHOLD_GRIDS = (
+    (("dna", "english", "printable", "repetitive"), ("stricter_bm", "bitwise_pm", "horspool"), (4, 16, 64, 128)),
+    (("dna", "english", "printable"), ("stricter_bm", "horspool"), (1 << 10, 1 << 14, 1 << 15, 1 << 16)),
+)
+# every threshold grid point is averaged over these seeds and this many pattern positions per text, as single runs
+# of the long patterns change winner from one seed to the next
+THRESHOLD_SEEDS = (0, 1, 2, 3, 4)
+THRESHOLD_POSITIONS = 3
+WORDS = ("the", "of", "and", "to", "in", "is", "that", "for", "it", "as", "was", "with", "be", "by", "on", "not",
+         "he", "this", "are", "or", "his", "from", "at", "which", "but", "have", "an", "had", "they", "you", "string",
+         "pattern", "suffix", "matching", "algorithm", "text", "character", "shift", "table", "search")
+
+
+def generate_text(kind: str, n: int, rng):
+    """
+    generates a synthetic text of the given kind
+    Args:
+        kind: one of "dna", "english", "printable" or "repetitive"
+        n: length of the text
+        rng: random.Random used to generate it, so the texts are reproducible
+
+    Returns:
+        a string of length n
+    """
+
+    if kind == "dna":
+        return "".join(rng.choices("ACGT", k=n))
+    elif kind == "english":
+        words = []
+        length = 0
+        while length < n:
+            word = rng.choice(WORDS)
+            words.append(word)
+            length += len(word) + 1
+        return " ".join(words)[:n]
+    elif kind == "printable":
+        return "".join(rng.choices([chr(i) for i in range(33, 127)], k=n))
+    elif kind == "repetitive":
+        return "a" * n
+    raise ValueError("Unknown text kind: {}".format(kind))
+
+
+def naive_search(txt: str, pat: str):
+    """
+    compares the pattern against every position of the text, O(nm)
+    Args:
+        txt: text
+        pat: pattern
+
+    Returns:
+        a list of indices of where the pattern occurs in the text
+    """
+
+    n = len(txt)
+    m = len(pat)
+    occurrences = []
+    for pos in range(n - m + 1):
+        k = 0
+        while k < m and txt[pos + k] == pat[k]:
+            k += 1
+        if k == m:
+            occurrences.append(pos)
+    return occurrences
+
+
+def find_search(txt: str, pat: str):
+    """
+    finds every occurrence of the pattern, including overlapping ones, using str.find
+    Args:
+        txt: text
+        pat: pattern
+
+    Returns:
+        a list of indices of where the pattern occurs in the text
+    """
+
+    occurrences = []
+    pos = txt.find(pat)
+    while pos != -1:
+        occurrences.append(pos)
+        pos = txt.find(pat, pos + 1)
+    return occurrences
+
+
+# every engine takes the text and the pattern, preprocessing included
+ENGINES = {
+    "stricter_bm": lambda txt, pat: CompiledPattern(pat).search(txt),
+    "bitwise_pm": bitwise_search,
+    "horspool": horspool_search,
+    "naive": naive_search,
+    "str_find": find_search,
+}
+
+
+def run_engine(engine, txt: str, pat: str):
+    """
+    runs an engine twice, once timed and once under tracemalloc, since tracing slows the engine down
+    Args:
+        engine: function taking the text and the pattern
+        txt: text
+        pat: pattern
+
+    Returns:
+        time taken in seconds, peak memory allocated in bytes and the occurrences found
+    """
+
+    start = time.perf_counter()
+    occurrences = engine(txt, pat)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    engine(txt, pat)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak, occurrences
+
+
+def run_suite(kinds=("dna", "english", "printable", "repetitive"), text_lengths=TEXT_LENGTHS,
+              pattern_lengths=PATTERN_LENGTHS, seed=0, engines=None, positions=1):
+    """
+    times every engine over the grid of text kinds, text lengths and pattern lengths. The pattern is taken from
+    the middle of the text so it always occurs at least once. Pattern lengths longer than the second half of the
+    text are skipped, since the pattern could not be taken whole from there
+    Args:
+        kinds: kinds of text to generate
+        text_lengths: lengths of text to generate
+        pattern_lengths: lengths of pattern to search for
+        seed: seed for the generated texts
+        engines: names of the engines to time, all of ENGINES by default
+        positions: number of patterns, each from a different position, timed per pattern length
+
+    Returns:
+        a list of dicts, one per run
+    """
+
+    engines = {name: ENGINES[name] for name in (engines or ENGINES)}
+
+    rows = []
+    for kind in kinds:
+        for n in text_lengths:
+            rng = random.Random(seed)
+            txt = generate_text(kind, n, rng)
+            for m in pattern_lengths:
+                if m > n - n // 2:
+                    continue
+                for _ in range(positions):
+                    start = rng.randrange(n // 4, n // 2)
+                    pat = txt[start:start + m]
+                    expected = None
+                    for name, engine in engines.items():
+                        elapsed, peak, occurrences = run_engine(engine, txt, pat)
+                        if expected is None:
+                            expected = occurrences
+                        elif occurrences != expected:
+                            raise ValueError(f"{name} disagrees with {next(iter(engines))} on {kind}, n={n}, m={m}")
+                        rows.append({"kind": kind, "text_length": n, "pattern_length": len(pat), "engine": name,
+                                     "seconds": round(elapsed, 6), "peak_bytes": peak,
+                                     "occurrences": len(occurrences)})
+    return rows
+
+
+def average_rows(rows: list):
+    """
+    merges the runs of each kind, text length, pattern length and engine into one row
+    Args:
+        rows: results from run_suite
+
+    Returns:
+        a list of dicts, one per grid point and engine, with the mean time, the largest peak memory, the mean
+        number of occurrences and the number of runs merged
+    """
+
+    groups = {}
+    for row in rows:
+        key = (row["kind"], row["text_length"], row["pattern_length"], row["engine"])
+        groups.setdefault(key, []).append(row)
+
+    averaged = []
+    for (kind, n, m, name), runs in groups.items():
+        averaged.append({"kind": kind, "text_length": n, "pattern_length": m, "engine": name,
+                         "seconds": round(sum(run["seconds"] for run in runs) / len(runs), 6),
+                         "peak_bytes": max(run["peak_bytes"] for run in runs),
+                         "occurrences": round(sum(run["occurrences"] for run in runs) / len(runs), 2),
+                         "runs": len(runs)})
+    return averaged
+
+
+def write_rows(rows: list, output_format: str, output_filename=None):
+    """
+    writes the results as csv or json, to a file or to stdout
+    Args:
+        rows: results from run_suite
+        output_format: "csv" or "json"
+        output_filename: file to write to, stdout if None
+
+    Returns:
+        None
+    """
+
+    file = open(output_filename, "w", newline="") if output_filename else sys.stdout
+    try:
+        if output_format == "json":
+            json.dump(rows, file, indent=2)
+            file.write("\n")
+        else:
+            writer = csv.DictWriter(file, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+    finally:
+        if output_filename:
+            file.close()
+
+
+def run_threshold_suite(seeds=THRESHOLD_SEEDS, positions=THRESHOLD_POSITIONS):
+    """
+    runs THRESHOLD_GRIDS, the measurements the find_all thresholds were chosen from, averaged over several texts
+    and pattern positions
+    Args:
+        seeds: seeds for the generated texts, one text per seed
+        positions: number of pattern positions timed per text
+
+    Returns:
+        a list of dicts, one per grid point and engine
+    """
+
+    rows = []
+    for kinds, engines, pattern_lengths in THRESHOLD_GRIDS:
+        for seed in seeds:
+            rows += run_suite(kinds=kinds, text_lengths=THRESHOLD_TEXT_LENGTHS, pattern_lengths=pattern_lengths,
+                              seed=seed, engines=engines, positions=positions)
+    return average_rows(rows)
+
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if arg != "--thresholds"]
+    if len(args) > 2 or (args and args[0] not in ("csv", "json")):
+        print("Usage: python benchmark_suite.py [csv | json] [output_file] [--thresholds]")
+    else:
+        rows = run_threshold_suite() if "--thresholds" in sys.argv else run_suite()
+        write_rows(rows, args[0] if args else "csv", args[1] if len(args) > 1 else None)
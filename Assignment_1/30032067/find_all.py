@@ -0,0 +1,116 @@
+import os
+import sys
+
+# the engines live in separate question folders
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "q1"))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "q2"))
+
+from stricterBM import compile_pattern
+from bitwisepm import bitwise_search
+from horspool import horspool_search
+
+
+# number of characters from the start of the text used to estimate its alphabet size
+ALPHABET_SAMPLE_SIZE = 1 << 12
+
+# thresholds measured with benchmark_suite.py --thresholds (10^5 and 10^6 character texts, patterns of 4 to 2^16
+# characters, averaged over 5 texts and 3 pattern positions each). horspool was fastest for almost every kind of
+# text and pattern length. bitwise_pm only won on texts made of one or two characters, where horspool keeps
+# shifting by 1, and only for patterns that fit in a machine word. stricter_bm came within noise of horspool for
+# patterns of 2^15 and 2^16 characters over DNA, winning on some machines and seeds and losing on others, so it is
+# never picked automatically
+BITWISE_MAX_ALPHABET = 2
+BITWISE_MAX_LENGTH = 64
+
+ENGINES = {
+    "stricter_bm": lambda text, pattern: compile_pattern(pattern).search(text),
+    "bitwise_pm": bitwise_search,
+    "horspool": horspool_search,
+}
+
+
+def find_all(text, pattern, engine=None, log=False):
+    """
+    finds every occurrence of the pattern in the text with whichever engine is expected to be fastest for it
+    Args:
+        text: text, str or bytes
+        pattern: pattern, the same type as text
+        engine: name of the engine to use, chosen with choose_engine if None
+        log: print the engine that was used
+
+    Returns:
+        a list of indices of where the pattern occurs in the text
+    """
+
+    if engine is None:
+        engine = choose_engine(text, pattern)
+    elif engine not in ENGINES:
+        raise ValueError("Unknown engine: {}".format(engine))
+
+    if log:
+        print("find_all: using " + engine + " for a pattern of length " + str(len(pattern)))
+    return ENGINES[engine](text, pattern)
+
+
+def choose_engine(text, pattern):
+    """
+    picks an engine from the pattern length and the alphabet size of a sample of the text
+    Args:
+        text: text
+        pattern: pattern
+
+    Returns:
+        the name of the engine, a key of ENGINES
+    """
+
+    m = len(pattern)
+    sigma = len(set(text[:ALPHABET_SAMPLE_SIZE]))
+
+    if sigma <= BITWISE_MAX_ALPHABET and 0 < m <= BITWISE_MAX_LENGTH:
+        return "bitwise_pm"
+    return "horspool"
+
+
+def read_input(txt_filename:str, pat_filename: str):
+    """
+    when given 2 filenames, stores the contents as strings and returns them
+    Args:
+        txt_filename: name of the file where the text is stored
+        pat_filename: name of the file where the pattern is stored
+
+    Returns:
+        2 strings, one containing the text and the other containing the pattern
+    """
+
+    with open(txt_filename, 'r') as txt_file:
+        txt = txt_file.read()
+    with open(pat_filename, 'r') as pat_file:
+        pat = pat_file.read()
+    return txt, pat
+
+
+def output_data(data: list, output_filename: str):
+    """
+    when given a list and a filename, outputs each element on a new line in the specified file
+    Args:
+        data: a list containing the data
+        output_filename: the name of the file where the data has to be output
+
+    Returns:
+        None
+    """
+
+    with open(output_filename, "w") as file:
+        for element in data:
+            file.write(str(element) + "\n")
+
+    # informs user when data has been written to the file
+    print("Data written to: " + output_filename)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (3, 4) or (len(sys.argv) == 4 and sys.argv[3] != "--log"):
+        print("Usage: python find_all.py txt_file pat_file [--log]")
+    else:
+        input_data = read_input(sys.argv[1], sys.argv[2])
+        output_data(find_all(input_data[0], input_data[1], log=len(sys.argv) == 4), "output_find_all.txt")
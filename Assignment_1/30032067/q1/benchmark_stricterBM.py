@@ -0,0 +1,122 @@
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from stricterBM import compile_pattern, get_ebc_array, parallel_search
+
+
+def legacy_ebc_array(pat: str):
+    """
+    the original m x 93 extended bad character table, kept only so the compact table can be compared against it
+    Args:
+        pat: the pattern
+
+    Returns:
+        a list of lists that can be used to find bad characters
+    """
+
+    m = len(pat)
+    bc_array = [[0]*93 for _ in range(m)]
+    for i in range(m):
+        for j in range(0, i):
+            bc_array[i][ord(pat[j]) - 33] = j + 1
+    return bc_array
+
+
+def measure(func, *args):
+    """
+    runs func once and measures how long it took and how much memory it allocated at its peak
+    Args:
+        func: function to run
+        args: arguments for func
+
+    Returns:
+        time taken in seconds and peak memory in bytes
+    """
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    func(*args)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def benchmark_ebc(max_legacy_length=3000):
+    """
+    times the compact extended bad character table against the legacy table for pattern lengths 10 to 10^6.
+    The legacy table is O(m^2) to build, so it is skipped for patterns longer than max_legacy_length
+    Args:
+        max_legacy_length: longest pattern the legacy table is built for
+
+    Returns:
+        None
+    """
+
+    random.seed(0)
+    print("m,compact_seconds,compact_peak_bytes,legacy_seconds,legacy_peak_bytes")
+    for exponent in range(1, 7):
+        m = 10 ** exponent
+        pat = "".join(random.choice("ACGT") for _ in range(m))
+        compact_time, compact_peak = measure(get_ebc_array, pat)
+        row = f"{m},{compact_time:.6f},{compact_peak}"
+        if m <= max_legacy_length:
+            legacy_time, legacy_peak = measure(legacy_ebc_array, pat)
+            row += f",{legacy_time:.6f},{legacy_peak}"
+        else:
+            row += ",,"
+        print(row)
+
+
+def benchmark_parallel(text_length=10 ** 7, max_workers=None):
+    """
+    measures how parallel_search scales with the number of worker processes, doubling the workers each run up to
+    max_workers. Speedup is relative to the single process search. The text is written to a temporary file for the
+    workers to memory map, as ASCII its byte offsets are the character positions the serial search reports
+    Args:
+        text_length: length of the random text searched
+        max_workers: largest number of workers tried, defaults to the number of cpus
+
+    Returns:
+        None
+    """
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    random.seed(0)
+    txt = "".join(random.choices("ACGT", k=text_length))
+    pat = "ACGTTGCAACGT"
+
+    start = time.perf_counter()
+    expected = compile_pattern(pat).search(txt)
+    baseline = time.perf_counter() - start
+
+    print("workers,seconds,speedup")
+    print(f"serial,{baseline:.4f},1.00")
+    with tempfile.TemporaryDirectory() as directory:
+        txt_path = os.path.join(directory, "txt.txt")
+        with open(txt_path, 'wb') as file:
+            file.write(txt.encode('ascii'))
+
+        workers = 1
+        while workers <= max_workers:
+            start = time.perf_counter()
+            result = parallel_search(txt_path, pat.encode('ascii'), workers)
+            elapsed = time.perf_counter() - start
+            if result != expected:
+                raise ValueError(f"parallel_search with {workers} workers does not match the serial search")
+            print(f"{workers},{elapsed:.4f},{baseline / elapsed:.2f}")
+            workers *= 2
+
+
+if __name__ == "__main__":
+    benchmarks = {"ebc": benchmark_ebc, "parallel": benchmark_parallel}
+    if len(sys.argv) < 2 or sys.argv[1] not in benchmarks:
+        print("Usage: python benchmark_stricterBM.py ebc [max_legacy_length]")
+        print("       python benchmark_stricterBM.py parallel [text_length] [max_workers]")
+    else:
+        benchmarks[sys.argv[1]](*[int(arg) for arg in sys.argv[2:]])
@@ -0,0 +1,114 @@
+import sys
+
+
+def horspool(txt_filename: str, pat_filename: str):
+    """
+    Boyer-Moore-Horspool pattern matching, only the bad character rule of the last character of the window is used
+    Args:
+        txt_filename: name of the file containing the text
+        pat_filename: name of the file containing the pattern
+
+    Returns:
+        None
+    """
+
+    input_data = read_input(txt_filename, pat_filename)
+    output_data(horspool_search(input_data[0], input_data[1]), "output_horspool.txt")
+
+
+def horspool_search(txt, pat):
+    """
+    finds every occurrence of the pattern in the text. After each window the pattern is shifted so the text
+    character under its last position lines up with the rightmost other occurrence of that character in the
+    pattern. Windows are checked with a single slice comparison, which is done in C
+    Args:
+        txt: text, str or bytes
+        pat: pattern, the same type as txt
+
+    Returns:
+        a list of indices of where the pattern occurs in the text
+    """
+
+    n = len(txt)
+    m = len(pat)
+    if m == 0 or m > n:
+        return []
+
+    shift_table = get_shift_table(pat)
+    get_shift = shift_table.get
+    last = m - 1
+    last_char = pat[last]
+
+    ret_val = []
+    pos = 0
+    while pos + last < n:
+        char = txt[pos + last]
+        # only compare the whole window when its last character already matches
+        if char == last_char and txt[pos:pos + m] == pat:
+            ret_val.append(pos)
+        pos += get_shift(char, m)
+    return ret_val
+
+
+def get_shift_table(pat):
+    """
+    given the pattern, calculates the shift for every character in pat[:-1], its distance from the rightmost
+    occurrence to the end of the pattern. Characters that are not in the table shift by m
+    Args:
+        pat: the pattern
+
+    Returns:
+        a dict from character to shift
+    """
+
+    m = len(pat)
+    shift_table = {}
+    for i in range(m - 1):
+        shift_table[pat[i]] = m - 1 - i
+    return shift_table
+
+
+def read_input(txt_filename:str, pat_filename: str):
+    """
+    when given 2 filenames, stores the contents as strings and returns them
+    Args:
+        txt_filename: name of the file where the text is stored
+        pat_filename: name of the file where the pattern is stored
+
+    Returns:
+        2 strings, one containing the text and the other containing the pattern
+    """
+
+    with open(txt_filename, 'r') as txt_file:
+        txt = txt_file.read()
+    with open(pat_filename, 'r') as pat_file:
+        pat = pat_file.read()
+    return txt, pat
+
+
+def output_data(data: list, output_filename: str):
+    """
+    when given a list and a filename, outputs each element on a new line in the specified file
+    Args:
+        data: a list containing the data
+        output_filename: the name of the file where the data has to be output
+
+    Returns:
+        None
+    """
+
+    with open(output_filename, "w") as file:
+        for element in data:
+            file.write(str(element) + "\n")
+
+    # informs user when data has been written to the file
+    print("Data written to: " + output_filename)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python your_script.py txt_file pat_file")
+    else:
+        txt_file = sys.argv[1]
+        pat_file = sys.argv[2]
+        horspool(txt_file, pat_file)
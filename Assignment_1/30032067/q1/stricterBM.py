@@ -1,13 +1,37 @@
+import json
+import mmap
+import os
 import sys
+from array import array
+from bisect import bisect_left
+from functools import lru_cache
+from itertools import chain, takewhile
+from multiprocessing import Pool
 
 
-def stricter_bm(txt_filename: str, pat_filename: str):
+# number of compiled patterns kept around by compile_pattern
+PATTERN_CACHE_SIZE = 256
+# number of characters read at a time by the streaming search
+CHUNK_SIZE = 1 << 20
+# size of the write buffer used by output_data, and of the read buffer used by read_varints
+OUTPUT_BUFFER_SIZE = 1 << 16
+# first bytes of every file written by write_varints
+VARINT_MAGIC = b"OCCV1"
+
+# compiled pattern and memory mapped text of a parallel_search worker process, set by init_worker
+worker_pattern = None
+worker_text = None
+
+
+def stricter_bm(txt_filename: str, pat_filename: str, stats_filename=None, binary=False):
     """
     boyer moore implementation. Uses bad character rule, matched prefix and a stricter vcersion of good suffix
     to pattern match and return a list of indices of where the pattern occurs in the text.
     Args:
         txt_filename: name of the file containing the text
         pat_filename: name of the file containing the pattern
+        stats_filename: if given, the search is instrumented and its SearchStats are written here as json
+        binary: write the indices to "output_stricterBM.bin" in the varint format instead of as text
 
     Returns:
         a list of indices of where the pattern occurs in the text
@@ -18,57 +42,411 @@ def stricter_bm(txt_filename: str, pat_filename: str):
     txt = input_data[0]
     pat = input_data[1]
 
-    # defines length of txt and pat
-    m = len(txt)
-    n = len(pat)
-    
-    # Preprocessing algorithms
-    z_array = get_z_array(pat)
-    bc_array = get_ebc_array(pat)
-    gs_array = get_gs_array(z_array)
-    mp_array = get_mp_array(z_array)
-
-    # value that will be output later
-    ret_val = []
-
-    # initialize the process
-    pos = 0
-    start = None
-    stop = None
-    # loops through the text. If the pattern exceeds the txt, it ends
-    while pos + (n-1) < m:
-        # comparison is carried out here, returns the value of mismatch index
-        mm_idx = compare(txt, pat, pos, start, stop)
-
-        # reset start and stop every time the comparison is complete
+    # preprocessing is cached per pattern, so repeated patterns skip it entirely
+    compiled_pat = compile_pattern(pat)
+    if stats_filename is None:
+        # occurrences are streamed straight into the output file
+        ret_val = compiled_pat.iter_search(txt)
+    else:
+        stats = SearchStats()
+        ret_val = compiled_pat.search_instrumented(txt, stats)
+        stats.dump(stats_filename)
+
+    # output the indices to a file titled "output_stricterBM.txt", or "output_stricterBM.bin"
+    if binary:
+        output_data(ret_val, "output_stricterBM.bin", binary=True)
+    else:
+        output_data(ret_val, "output_stricterBM.txt")
+
+
+def stricter_bm_bytes(txt_filename: str, pat_filename: str, binary=False):
+    """
+    byte mode stricter_bm for binary files. Both files are read as raw bytes and the text is memory mapped, so
+    nothing is decoded or copied and any byte value can appear in the text or the pattern
+    Args:
+        txt_filename: name of the file containing the text
+        pat_filename: name of the file containing the pattern
+        binary: write the indices to "output_stricterBM.bin" in the varint format instead of as text
+
+    Returns:
+        None
+    """
+
+    with open(pat_filename, 'rb') as pat_file:
+        pat = pat_file.read()
+    compiled_pat = compile_pattern(pat)
+    output_filename = "output_stricterBM.bin" if binary else "output_stricterBM.txt"
+
+    with open(txt_filename, 'rb') as txt_file:
+        # an empty file cannot be memory mapped
+        if os.fstat(txt_file.fileno()).st_size == 0:
+            output_data([], output_filename, binary)
+            return
+        with mmap.mmap(txt_file.fileno(), 0, access=mmap.ACCESS_READ) as txt:
+            with memoryview(txt) as view:
+                output_data(compiled_pat.iter_search(view), output_filename, binary)
+
+
+def stricter_bm_stream(txt_filename: str, pat_filename: str, chunk_size=CHUNK_SIZE, binary=False):
+    """
+    streaming version of stricter_bm for texts too large to fit in memory. Only chunk_size characters of the text
+    are held at a time and occurrences are written out as they are found
+    Args:
+        txt_filename: name of the file containing the text
+        pat_filename: name of the file containing the pattern
+        chunk_size: number of characters of the text read at a time
+        binary: write the indices to "output_stricterBM.bin" in the varint format instead of as text
+
+    Returns:
+        None
+    """
+
+    pat_file = open(pat_filename, 'r')
+    pat = pat_file.read()
+    pat_file.close()
+
+    compiled_pat = compile_pattern(pat)
+    with open(txt_filename, 'r') as txt_file:
+        if binary:
+            output_data(compiled_pat.search_stream(txt_file, chunk_size), "output_stricterBM.bin", binary=True)
+        else:
+            output_data(compiled_pat.search_stream(txt_file, chunk_size), "output_stricterBM.txt")
+
+
+def parallel_stricter_bm(txt_filename: str, pat_filename: str, workers=None):
+    """
+    parallel version of stricter_bm, the text is split into shards which are searched in a process pool. Like
+    stricter_bm_bytes the files are read as raw bytes, so the indices are byte offsets, the same as stricter_bm's
+    for ASCII text
+    Args:
+        txt_filename: name of the file containing the text
+        pat_filename: name of the file containing the pattern
+        workers: number of processes to use, defaults to the number of cpus
+
+    Returns:
+        None
+    """
+
+    with open(pat_filename, 'rb') as pat_file:
+        pat = pat_file.read()
+    ret_val = parallel_search(txt_filename, pat, workers)
+    output_data(ret_val, "output_stricterBM.txt")
+
+
+def parallel_search(txt_filename: str, pat: bytes, workers=None):
+    """
+    splits the text file into one shard per worker, each overlapping the next by n - 1 bytes so no occurrence is
+    cut in half, and searches the shards in a process pool. Only the offsets of each shard are sent, every worker
+    memory maps the file itself, so the text is never read into or copied out of this process. The pattern is
+    preprocessed once here and handed to every worker when it starts
+    Args:
+        txt_filename: name of the file containing the text
+        pat: pattern, as bytes
+        workers: number of processes to use, defaults to the number of cpus
+
+    Returns:
+        a sorted list of byte offsets of where the pattern occurs in the text
+    """
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    size = os.path.getsize(txt_filename)
+    # an empty file cannot be memory mapped
+    if size == 0:
+        return []
+    compiled_pat = compile_pattern(pat)
+
+    # every shard starts shard_size bytes after the previous one, the worker reads n - 1 extra bytes past its end
+    shard_size = max(-(-size // workers), 1)
+    shards = [(start, start + shard_size) for start in range(0, size, shard_size)]
+
+    with Pool(workers, initializer=init_worker, initargs=(txt_filename, compiled_pat)) as pool:
+        results = pool.starmap(search_shard, shards)
+
+    # every shard only reports occurrences starting before the next shard, so the results are already in order
+    return list(chain.from_iterable(results))
+
+
+def init_worker(txt_filename: str, compiled_pat):
+    """
+    memory maps the text and stores the compiled pattern in a worker process, so both are set up once per worker
+    Args:
+        txt_filename: name of the file containing the text
+        compiled_pat: CompiledPattern to search for
+
+    Returns:
+        None
+    """
+
+    global worker_pattern, worker_text
+    worker_pattern = compiled_pat
+    with open(txt_filename, 'rb') as txt_file:
+        worker_text = mmap.mmap(txt_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def search_shard(offset: int, end: int):
+    """
+    searches a single shard of the memory mapped text in a worker process
+    Args:
+        offset: position of the shard in the text
+        end: position in the whole text where the next shard starts, occurrences from there on belong to it
+
+    Returns:
+        a list of indices in the whole text where the pattern occurs
+    """
+
+    with memoryview(worker_text)[offset:end + len(worker_pattern.pat) - 1] as shard:
+        return list(takewhile(lambda pos: pos < end, worker_pattern.iter_search(shard, 0, offset)))
+
+
+@lru_cache(maxsize=PATTERN_CACHE_SIZE)
+def compile_pattern(pat: str):
+    """
+    given a pattern, returns its preprocessed CompiledPattern. Results are kept in a size bounded LRU cache keyed
+    by the pattern, hit/miss counts can be read using pattern_cache_info()
+    Args:
+        pat: the pattern
+
+    Returns:
+        a CompiledPattern for pat
+    """
+
+    return CompiledPattern(pat)
+
+
+def pattern_cache_info():
+    """
+    reports how well the pattern cache is doing, useful when deciding on PATTERN_CACHE_SIZE
+    Returns:
+        a named tuple with hits, misses, maxsize and currsize of the pattern cache
+    """
+
+    return compile_pattern.cache_info()
+
+
+class CompiledPattern:
+    def __init__(self, pat):
+        """
+        Runs all the preprocessing needed for a pattern once and stores the resulting arrays, so the pattern can be
+        searched for in any number of texts. A bytes pattern gets a 256 entry bad character table and can be
+        searched for in bytes, mmap or memoryview texts, comparing bytes as ints
+        Args:
+            pat: the pattern, str or bytes
+        """
+
+        self.pat = pat
+        self.z_array = get_z_array(pat)
+        if isinstance(pat, bytes):
+            self.bc_array = get_ebc_table(pat)
+            self.ebc_shift = get_ebc_shift_bytes
+        else:
+            self.bc_array = get_ebc_array(pat)
+            self.ebc_shift = get_ebc_shift
+        self.gs_array = get_gs_array(self.z_array)
+        self.mp_array = get_mp_array(self.z_array)
+
+    def search(self, txt: str):
+        """
+        searches the text for the pattern using the preprocessed arrays
+        Args:
+            txt: text
+
+        Returns:
+            a list of indices of where the pattern occurs in the text
+        """
+
+        return list(self.iter_search(txt))
+
+    def iter_search(self, txt: str, pos=0, offset=0):
+        """
+        runs the compare/shift loop over txt starting from pos, yielding matches as they are found. Used by both
+        search and search_stream
+        Args:
+            txt: text
+            pos: position of the pattern to start from
+            offset: value added to every yielded index, the position of txt inside a larger text
+
+        Returns:
+            yields offset + index for every occurrence, then returns the position the next window would start at
+        """
+
+        pat = self.pat
+        bc_array = self.bc_array
+        get_ebc = self.ebc_shift
+        gs_array = self.gs_array
+        mp_array = self.mp_array
+
+        # defines length of txt and pat
+        m = len(txt)
+        n = len(pat)
+
+        # initialize the process
         start = None
         stop = None
+        # loops through the text. If the pattern exceeds the txt, it ends
+        while pos + (n-1) < m:
+            # comparison is carried out here, returns the value of mismatch index
+            mm_idx = compare(txt, pat, pos, start, stop)
 
-        # full match, take value of mp_array[1] or 1, if mp_array[1] == 0
-        if mm_idx == pos - 1:
-            ret_val.append(pos)
-            shift = max(mp_array[1], 1)
+            # reset start and stop every time the comparison is complete
+            start = None
+            stop = None
 
-        # mismatch
-        else:
-            # calculate gs_shift and extended bad character shift
-            gs_shift = get_gs_shift(pos, mm_idx, n, gs_array, mp_array)
-            ebc_shift = get_ebc_shift(pos, mm_idx, bc_array, txt[mm_idx])
-
-            # if gs shift is selected, stop and start are updated as well as shift
-            if gs_shift[0] > ebc_shift:
-                shift = gs_shift[0]
-                start = gs_shift[1]
-                stop = gs_shift[2]
-            # if ebc is selected, stop and start remain as None while shift is updated
+            # full match, shift so the longest proper prefix that is also a suffix lines up, mp_array[1]
+            if mm_idx == pos - 1:
+                yield offset + pos
+                shift = n - mp_array[1]
+
+            # mismatch
             else:
-                shift = ebc_shift
+                # calculate gs_shift and extended bad character shift
+                gs_shift = get_gs_shift(pos, mm_idx, n, gs_array, mp_array)
+                ebc_shift = get_ebc(pos, mm_idx, bc_array, txt[mm_idx])
+
+                # if gs shift is selected, stop and start are updated as well as shift
+                if gs_shift[0] > ebc_shift:
+                    shift = gs_shift[0]
+                    start = gs_shift[1]
+                    stop = gs_shift[2]
+                # if ebc is selected, stop and start remain as None while shift is updated
+                else:
+                    shift = ebc_shift
+
+            # update the starting position of the pattern
+            pos += shift
+
+        return pos
+
+    def search_stream(self, txt_file, chunk_size=CHUNK_SIZE):
+        """
+        searches an open text file for the pattern without reading all of it into memory. The file is read
+        chunk_size characters at a time and the part of the previous chunk the pattern has not moved past yet (at
+        most n - 1 characters) is kept in front of the next one, so the compare/shift loop carries on across chunk
+        boundaries and the matches are identical to search
+        Args:
+            txt_file: text file opened for reading
+            chunk_size: number of characters read at a time
+
+        Returns:
+            yields the indices of where the pattern occurs in the text, in increasing order
+        """
+
+        buffer = ""
+        offset = 0
+        while True:
+            chunk = txt_file.read(chunk_size)
+            if not chunk:
+                break
+            buffer += chunk
+
+            # scan as far as possible, then drop everything before the pattern's next position
+            pos = yield from self.iter_search(buffer, 0, offset)
+            buffer = buffer[pos:]
+            offset += pos
+
+
+    def search_instrumented(self, txt: str, stats):
+        """
+        same as search, but records what the search did in stats. This is a separate copy of the loop so that
+        search itself pays nothing for the instrumentation
+        Args:
+            txt: text
+            stats: SearchStats to add the counts to
+
+        Returns:
+            a list of indices of where the pattern occurs in the text
+        """
+
+        pat = self.pat
+        bc_array = self.bc_array
+        get_ebc = self.ebc_shift
+        gs_array = self.gs_array
+        mp_array = self.mp_array
+        shifts = stats.shifts
+
+        m = len(txt)
+        n = len(pat)
+        ret_val = []
+
+        pos = 0
+        start = None
+        stop = None
+        while pos + (n-1) < m:
+            mm_idx = compare_instrumented(txt, pat, pos, start, stop, stats)
+            start = None
+            stop = None
 
-        # update the starting position of the pattern
-        pos += shift
+            if mm_idx == pos - 1:
+                ret_val.append(pos)
+                shift = n - mp_array[1]
+                stats.full_matches += 1
 
-    # output the indices to a file titled "output_stricterBM.txt"
-    output_data(ret_val, "output_stricterBM.txt")
+            else:
+                gs_shift = get_gs_shift(pos, mm_idx, n, gs_array, mp_array)
+                ebc_shift = get_ebc(pos, mm_idx, bc_array, txt[mm_idx])
+
+                if gs_shift[0] > ebc_shift:
+                    shift = gs_shift[0]
+                    start = gs_shift[1]
+                    stop = gs_shift[2]
+                    # get_gs_shift falls back to the matched prefix when there is no good suffix
+                    if gs_array[mm_idx-pos + 1] > 0:
+                        stats.good_suffix_wins += 1
+                    else:
+                        stats.matched_prefix_wins += 1
+                else:
+                    shift = ebc_shift
+                    stats.bad_character_wins += 1
+
+            shifts[shift] = shifts.get(shift, 0) + 1
+            pos += shift
+
+        return ret_val
+
+
+class SearchStats:
+    def __init__(self):
+        """
+        Counters filled in by CompiledPattern.search_instrumented
+        """
+
+        self.comparisons = 0
+        self.skipped_comparisons = 0
+        self.full_matches = 0
+        self.good_suffix_wins = 0
+        self.matched_prefix_wins = 0
+        self.bad_character_wins = 0
+        # shift size -> number of times the pattern was shifted by that much
+        self.shifts = {}
+
+    def to_dict(self):
+        """
+        Returns: the counters as a dict, with the shift histogram sorted by shift size
+        """
+
+        return {
+            "comparisons": self.comparisons,
+            "skipped_comparisons": self.skipped_comparisons,
+            "full_matches": self.full_matches,
+            "good_suffix_wins": self.good_suffix_wins,
+            "matched_prefix_wins": self.matched_prefix_wins,
+            "bad_character_wins": self.bad_character_wins,
+            "shifts": {str(shift): self.shifts[shift] for shift in sorted(self.shifts)},
+        }
+
+    def dump(self, output_filename: str):
+        """
+        writes the counters to a file as json
+        Args:
+            output_filename: the name of the file where the counters have to be output
+
+        Returns:
+            None
+        """
+
+        with open(output_filename, "w") as file:
+            json.dump(self.to_dict(), file, indent=2)
+        print("Stats written to: " + output_filename)
 
 
 def compare(txt: str, pat: str, pos: int, start=None, stop=None):
@@ -110,27 +488,91 @@ def compare(txt: str, pat: str, pos: int, start=None, stop=None):
         return k
 
 
+def compare_instrumented(txt: str, pat: str, pos: int, start, stop, stats):
+    """
+    same as compare, but counts the character comparisons made and the ones galil's optimization skipped
+    Args:
+        txt: text
+        pat: pattern
+        pos: position of pattern
+        start: start
+        stop: stop
+        stats: SearchStats to add the counts to
+
+    Returns:
+        index of mismatch
+    """
+
+    n = len(pat)
+    k = pos + n - 1
+    if start is None and stop is None:
+        while k >= pos:
+            stats.comparisons += 1
+            if txt[k] != pat[k - pos]:
+                break
+            k -= 1
+        return k
+
+    while k >= stop:
+        stats.comparisons += 1
+        if txt[k] != pat[k - pos]:
+            return k
+        k -= 1
+
+    # everything strictly between start and stop is known to match
+    stats.skipped_comparisons += max(stop - start - 1, 0)
+    k = start
+    while k >= pos:
+        stats.comparisons += 1
+        if txt[k] != pat[k - pos]:
+            break
+        k -= 1
+    return k
+
+
 def get_ebc_array(pat: str):
     """
-    given pattern, calculates the extended bad character rule array
+    given pattern, calculates the extended bad character rule table in O(m). Instead of an m x 93 table, every
+    character in the pattern maps to a sorted array of the positions it occurs at, so the table is O(m) in size
+    and works for any character
 
     Args:
         pat: the pattern
 
-    Returns: a list of lists that can be used to find bad characters
+    Returns: a dict from character to an array('i') of its positions in the pattern
 
     """
 
-    m = len(pat)
-    bc_array = [[0]*93 for _ in range(m)]                # 93 printable characters in ASCII, 33-126
-    for i in range(m):
-        for j in range(0, i):
-            current = ord(pat[j]) - 33                   # first position starts at 33
-            bc_array[i][current] = j + 1
-            
+    bc_array = {}
+    for j in range(len(pat)):
+        positions = bc_array.get(pat[j])
+        if positions is None:
+            positions = array('i')
+            bc_array[pat[j]] = positions
+        # positions are appended left to right, so each array stays sorted
+        positions.append(j)
+
     return bc_array
     
 
+def get_ebc_table(pat: bytes):
+    """
+    byte version of get_ebc_array, a list indexed directly by byte value instead of a dict
+
+    Args:
+        pat: the pattern
+
+    Returns: a list of 256 array('i'), the sorted positions of every byte value in the pattern
+
+    """
+
+    bc_array = [array('i') for _ in range(256)]
+    for j in range(len(pat)):
+        bc_array[pat[j]].append(j)
+
+    return bc_array
+
+
 def get_z_array(pat: str):
     """
     Implements Gusfield's Z-Algorithm in reverse to compute the reverse z-values of a given string
@@ -249,14 +691,16 @@ def get_gs_shift(pos: int, mm_idx: int, n: int, gs_array: list, mp_array: list):
     if gs_shift > 0:
         return [n-gs_shift, p-((pos+n-1) - mm_idx), p]
     # if gs shift doesnt exist but mp shift does, return that along with the start and stop values
+    # the matched prefix covers everything up to the old end of the pattern, so only the new part is compared
     elif mp_array[mm_idx-pos + 1] > 0:
-        return [n - mp_array[mm_idx-pos + 1], next_pos, next_pos + mp_array[mm_idx-pos + 1]]
+        mp_shift = n - mp_array[mm_idx-pos + 1]
+        return [mp_shift, pos + mp_shift - 1, pos + n]
     # if neither exists, shift by 1 and set start and stop to None
     else:
         return [1, None, None]
 
 
-def get_ebc_shift(pos: int, mm_idx: int, bc_array: list, mm_char: str):
+def get_ebc_shift(pos: int, mm_idx: int, bc_array: dict, mm_char: str):
     """
         given the mismatch position, the bad character and the bad character array, computes the shift resulting
         from the bad character rule and the range within the pattern that can be skipped from explicit character
@@ -272,11 +716,41 @@ def get_ebc_shift(pos: int, mm_idx: int, bc_array: list, mm_char: str):
 
     """
 
+    # find the rightmost occurrence of the bad character to the left of the mismatch in O(log m)
+    k = mm_idx - pos
+    occurrence = 0
+    positions = bc_array.get(mm_char)
+    if positions is not None:
+        idx = bisect_left(positions, k)
+        if idx > 0:
+            occurrence = positions[idx - 1] + 1
+
     # returns ebc if the shift > 0 and 1 otherwise
-    ebc = mm_idx - pos - bc_array[mm_idx-pos][ord(mm_char) - 33]
+    ebc = k - occurrence
     return ebc if ebc > 0 else 1
     
 
+def get_ebc_shift_bytes(pos: int, mm_idx: int, bc_array: list, mm_char: int):
+    """
+        byte version of get_ebc_shift, for tables made by get_ebc_table
+
+    Args:
+        pos: position of pattern
+        mm_idx: mismatch index
+        bc_array: extended bad character table
+        mm_char: mismatch byte
+
+    Returns:
+
+    """
+
+    k = mm_idx - pos
+    positions = bc_array[mm_char]
+    idx = bisect_left(positions, k)
+    ebc = k - positions[idx - 1] - 1 if idx > 0 else k
+    return ebc if ebc > 0 else 1
+
+
 def read_input(txt_filename:str, pat_filename: str):
     """
     when given 2 filenames, stores the contents as strings and returns them
@@ -299,28 +773,109 @@ def read_input(txt_filename:str, pat_filename: str):
     return txt, pat
 
 
-def output_data(data: list, output_filename: str):
+def output_data(data, output_filename: str, binary=False):
     """
-    when given a list and a filename, outputs each element on a new line in the specified file
+    when given a list (or any iterable) and a filename, outputs each element on a new line in the specified file.
+    Elements are written through a large buffer as they arrive, so a generator is never materialised
     Args:
-        data: a list containing the data
+        data: a list or generator containing the data
         output_filename: the name of the file where the data has to be output
+        binary: write the data with write_varints instead, data must then be increasing non-negative ints
 
     Returns:
         None
     """
 
-    with open(output_filename, "w") as file:
-        for element in data:
-            file.write(str(element) + "\n")
+    if binary:
+        write_varints(data, output_filename)
+    else:
+        with open(output_filename, "w", buffering=OUTPUT_BUFFER_SIZE) as file:
+            file.writelines(str(element) + "\n" for element in data)
 
     # informs user when data has been written to the file
     print("Data written to: " + output_filename)
 
 
+def write_varints(data, output_filename: str):
+    """
+    writes increasing non-negative ints in the compact binary format: the VARINT_MAGIC header followed by the gap
+    between each element and the one before it (the first element is its own gap), each gap as an unsigned LEB128
+    varint, 7 bits per byte with the top bit set on every byte but the last
+    Args:
+        data: a list or generator of increasing non-negative ints
+        output_filename: the name of the file where the data has to be output
+
+    Returns:
+        None
+    """
+
+    with open(output_filename, "wb") as file:
+        file.write(VARINT_MAGIC)
+        buffer = bytearray()
+        prev = 0
+        for element in data:
+            gap = element - prev
+            if gap < 0:
+                raise ValueError("varint output needs increasing values, got {} after {}".format(element, prev))
+            prev = element
+            while gap >= 0x80:
+                buffer.append((gap & 0x7f) | 0x80)
+                gap >>= 7
+            buffer.append(gap)
+
+            if len(buffer) >= OUTPUT_BUFFER_SIZE:
+                file.write(buffer)
+                buffer.clear()
+        file.write(buffer)
+
+
+def read_varints(input_filename: str):
+    """
+    reads a file written by write_varints, OUTPUT_BUFFER_SIZE bytes at a time
+    Args:
+        input_filename: name of the file to read
+
+    Returns:
+        yields the original ints, in order
+    """
+
+    with open(input_filename, "rb") as file:
+        if file.read(len(VARINT_MAGIC)) != VARINT_MAGIC:
+            raise ValueError("{} is not a varint output file".format(input_filename))
+        prev = 0
+        gap = 0
+        shift = 0
+        while True:
+            chunk = file.read(OUTPUT_BUFFER_SIZE)
+            if not chunk:
+                break
+            # a varint may continue into the next chunk, so gap and shift carry over
+            for byte in chunk:
+                gap |= (byte & 0x7f) << shift
+                if byte & 0x80:
+                    shift += 7
+                else:
+                    prev += gap
+                    yield prev
+                    gap = 0
+                    shift = 0
+        if shift:
+            raise ValueError("{} ends in the middle of a varint".format(input_filename))
+
+
 if __name__ == "__main__":
-    if len(sys.argv) != 3:
-        print("Usage: python your_script.py txt_file pat_file")
+    if len(sys.argv) == 4 and sys.argv[3] == "--stream":
+        stricter_bm_stream(sys.argv[1], sys.argv[2])
+    elif len(sys.argv) == 4 and sys.argv[3] == "--parallel":
+        parallel_stricter_bm(sys.argv[1], sys.argv[2])
+    elif len(sys.argv) == 4 and sys.argv[3] == "--stats":
+        stricter_bm(sys.argv[1], sys.argv[2], "stats_stricterBM.json")
+    elif len(sys.argv) == 4 and sys.argv[3] == "--binary":
+        stricter_bm(sys.argv[1], sys.argv[2], binary=True)
+    elif len(sys.argv) == 4 and sys.argv[3] == "--bytes":
+        stricter_bm_bytes(sys.argv[1], sys.argv[2])
+    elif len(sys.argv) != 3:
+        print("Usage: python your_script.py txt_file pat_file [--stream | --parallel | --stats | --binary | --bytes]")
     else:
         txt_file = sys.argv[1]
         pat_file = sys.argv[2]
@@ -0,0 +1,200 @@
+import os
+import random
+import sys
+import tempfile
+import time
+
+from bitarray import bitarray
+
+from bitwisepm import bitwise_search, multi_pattern_search, parallel_search
+from vectorpm import vector_search
+
+
+def legacy_bitwise_search(txt: str, pat: str):
+    """
+    the original bitarray implementation, which builds a fresh m bit delta j for every text character. Kept only
+    so the int based engine can be compared against it
+    Args:
+        txt: the text
+        pat: the pattern
+
+    Returns:
+        a list containing the starting positions of occurrences of the pattern in the text
+    """
+
+    n = len(txt)
+    m = len(pat)
+    if m > n:
+        return []
+
+    occurrences = []
+    prev_bitvector = bitarray([0] * m)
+    for iteration in range(m):
+        for i in range(m - iteration):
+            if txt[i + iteration] != pat[i]:
+                prev_bitvector[iteration] = 1
+    if not prev_bitvector[0]:
+        occurrences.append(0)
+
+    for j in range(m, n):
+        deltaj = bitarray()
+        for i in range(m, 0, -1):
+            deltaj.append(1 if txt[j] != pat[i - 1] else 0)
+        shifted_bitvector = prev_bitvector[1:]
+        shifted_bitvector.append(False)
+        prev_bitvector = shifted_bitvector | deltaj
+        if not prev_bitvector[0]:
+            occurrences.append(j - m + 1)
+    return occurrences
+
+
+def benchmark_engine(text_length=10 ** 5):
+    """
+    times the int based shift-or engine against the legacy bitarray implementation for a range of pattern lengths
+    Args:
+        text_length: length of the random text searched
+
+    Returns:
+        None
+    """
+
+    random.seed(0)
+    txt = "".join(random.choices("ACGT", k=text_length))
+    print("m,engine_seconds,legacy_seconds,speedup")
+    for m in (2, 4, 8, 16, 32, 64, 128):
+        pat = txt[text_length // 2:text_length // 2 + m]
+
+        start = time.perf_counter()
+        result = bitwise_search(txt, pat)
+        engine = time.perf_counter() - start
+
+        start = time.perf_counter()
+        expected = legacy_bitwise_search(txt, pat)
+        legacy = time.perf_counter() - start
+
+        if result != expected:
+            raise ValueError(f"bitwise_search does not match the legacy implementation for m = {m}")
+        print(f"{m},{engine:.4f},{legacy:.4f},{legacy / engine:.1f}")
+
+
+def benchmark_parallel(text_length=10 ** 6, max_workers=None):
+    """
+    measures how parallel_search scales with the number of worker processes, doubling the workers each run up to
+    max_workers. Speedup is relative to the single process search. The text is written to a temporary file for the
+    workers to memory map, as ASCII its byte offsets are the character positions the serial search reports
+    Args:
+        text_length: length of the random text searched
+        max_workers: largest number of workers tried, defaults to the number of cpus
+
+    Returns:
+        None
+    """
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    random.seed(0)
+    txt = "".join(random.choices("ACGT", k=text_length))
+    pat = "ACGTTGCAACGT"
+
+    start = time.perf_counter()
+    expected = bitwise_search(txt, pat)
+    baseline = time.perf_counter() - start
+
+    print("workers,seconds,speedup")
+    print(f"serial,{baseline:.4f},1.00")
+    with tempfile.TemporaryDirectory() as directory:
+        txt_path = os.path.join(directory, "txt.txt")
+        with open(txt_path, 'wb') as file:
+            file.write(txt.encode('ascii'))
+
+        workers = 1
+        while workers <= max_workers:
+            start = time.perf_counter()
+            result = parallel_search(txt_path, pat.encode('ascii'), workers)
+            elapsed = time.perf_counter() - start
+            if result != expected:
+                raise ValueError(f"parallel_search with {workers} workers does not match the serial search")
+            print(f"{workers},{elapsed:.4f},{baseline / elapsed:.2f}")
+            workers *= 2
+
+
+def benchmark_multi(text_length=10 ** 5, max_patterns=500):
+    """
+    times multi_pattern_search against running bitwise_search once per pattern, for 50 up to max_patterns random
+    patterns of length 4 to 16
+    Args:
+        text_length: length of the random text searched
+        max_patterns: largest number of patterns tried
+
+    Returns:
+        None
+    """
+
+    random.seed(0)
+    txt = "".join(random.choices("abcdefghijklmnopqrstuvwxyz", k=text_length))
+    print("patterns,multi_seconds,sequential_seconds,speedup")
+    n_patterns = 50
+    while n_patterns <= max_patterns:
+        patterns = []
+        for _ in range(n_patterns):
+            m = random.randint(4, 16)
+            start = random.randrange(text_length - m)
+            patterns.append(txt[start:start + m])
+
+        start = time.perf_counter()
+        result = multi_pattern_search(txt, patterns)
+        multi = time.perf_counter() - start
+
+        start = time.perf_counter()
+        expected = []
+        for pattern_id in range(n_patterns):
+            expected += [(pattern_id, offset) for offset in bitwise_search(txt, patterns[pattern_id])]
+        sequential = time.perf_counter() - start
+
+        if result != sorted(expected, key=lambda occurrence: (occurrence[1], occurrence[0])):
+            raise ValueError(f"multi_pattern_search does not match bitwise_search for {n_patterns} patterns")
+        print(f"{n_patterns},{multi:.4f},{sequential:.4f},{sequential / multi:.1f}")
+        n_patterns *= 2
+
+
+def benchmark_vector(text_length=10 ** 6):
+    """
+    times the numpy vectorized engine against bitwise_search for a range of pattern lengths. The vectorized engine
+    does one pass over the text per pattern position, so it wins for short patterns and loses its lead as m grows
+    Args:
+        text_length: length of the random text searched
+
+    Returns:
+        None
+    """
+
+    random.seed(0)
+    txt = "".join(random.choices("ACGT", k=text_length))
+    txt_bytes = txt.encode()
+    print("m,vector_seconds,bitwise_seconds,speedup")
+    for m in (1, 2, 4, 8, 16, 32, 64, 128, 256):
+        pat = txt[text_length // 2:text_length // 2 + m]
+
+        start = time.perf_counter()
+        result = vector_search(txt_bytes, pat.encode())
+        vector = time.perf_counter() - start
+
+        start = time.perf_counter()
+        expected = bitwise_search(txt, pat)
+        bitwise = time.perf_counter() - start
+
+        if result != expected:
+            raise ValueError(f"vector_search does not match bitwise_search for m = {m}")
+        print(f"{m},{vector:.4f},{bitwise:.4f},{bitwise / vector:.1f}")
+
+
+if __name__ == "__main__":
+    benchmarks = {"engine": benchmark_engine, "multi": benchmark_multi, "parallel": benchmark_parallel,
+                  "vector": benchmark_vector}
+    if len(sys.argv) < 2 or sys.argv[1] not in benchmarks:
+        print("Usage: python benchmark_bitwisepm.py engine [text_length]")
+        print("       python benchmark_bitwisepm.py multi [text_length] [max_patterns]")
+        print("       python benchmark_bitwisepm.py parallel [text_length] [max_workers]")
+        print("       python benchmark_bitwisepm.py vector [text_length]")
+    else:
+        benchmarks[sys.argv[1]](*[int(arg) for arg in sys.argv[2:]])
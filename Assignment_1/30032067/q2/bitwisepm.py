@@ -1,14 +1,28 @@
-from bitarray import bitarray
+from itertools import chain, takewhile
+from multiprocessing import Pool
+import mmap
+import os
 import sys
 
 
-def bitwise_pm(txt_filename: str, pat_filename: str):
+# size of the write buffer used by output_data, and of the read buffer used by read_varints
+OUTPUT_BUFFER_SIZE = 1 << 16
+# first bytes of every file written by write_varints
+VARINT_MAGIC = b"OCCV1"
+
+# pattern and masks, and memory mapped text, of a parallel_search worker process, set by init_worker
+worker_pattern = None
+worker_text = None
+
+
+def bitwise_pm(txt_filename: str, pat_filename: str, binary=False):
     """
     Performs bitwise pattern matching using a sliding window approach.
 
     Args:
         txt_filename (str): the name of the file containing the text
         pat_filename (str): the name of the file containing the pattern
+        binary (bool): write to "output_bitwisepm.bin" in the varint format instead of as text
 
     Returns:
         list: A list containing the starting positions of occurrences of the pattern in the text.
@@ -18,120 +32,515 @@ def bitwise_pm(txt_filename: str, pat_filename: str):
     data = read_input(txt_filename, pat_filename)
     txt = data[0]
     pat = data[1]
+
+    # if the pattern is longer than the text, return empty list
+    if len(pat) > len(txt):
+        return []
+
+    # occurrences are streamed straight into the output file
+    occurrences = iter_bitwise_search(txt, pat)
+
+    # output to the file
+    if binary:
+        output_data(occurrences, "output_bitwisepm.bin", binary=True)
+    else:
+        output_filename = "output_bitwisepm.txt"
+        output_data(occurrences, output_filename)
+
+
+def bitwise_search(txt: str, pat: str, offset=0, masks=None):
+    """
+    Finds every occurrence of the pattern in the text, see iter_bitwise_search.
+
+    Args:
+        txt (str): the text
+        pat (str): the pattern
+        offset (int): value added to every occurrence, the position of txt inside a larger text
+        masks (dict): delta j of every character in the pattern, computed from pat if not given
+
+    Returns:
+        list: A list containing the starting positions of occurrences of the pattern in the text.
+    """
+
+    return list(iter_bitwise_search(txt, pat, offset, masks))
+
+
+def iter_bitwise_search(txt: str, pat: str, offset=0, masks=None):
+    """
+    Finds every occurrence of the pattern in the text using the bitvector recurrence. Bitvectors are stored as
+    python ints, bit i is 0 when pat[:i+1] matches the text ending at the current character, so each text character
+    costs a dict lookup, a shift and an OR.
+
+    Args:
+        txt (str): the text
+        pat (str): the pattern
+        offset (int): value added to every occurrence, the position of txt inside a larger text
+        masks (dict): delta j of every character in the pattern, computed from pat if not given
+
+    Returns:
+        yields the starting positions of occurrences of the pattern in the text, in increasing order.
+    """
+
     n = len(txt)
     m = len(pat)
 
-    # if the pattern is longer than the text, return empty list
+    # if the pattern is longer than the text, there are no occurrences
     if m > n:
-        return []
+        return
 
-    # initialize occurrences return value
-    occurrences = []
+    if masks is None:
+        masks = compute_masks(pat)
+    # characters that are not in the pattern mismatch every position
+    all_ones = (1 << m) - 1
+    # a bitvector is a match when its top bit, bit m - 1, is 0
+    match_limit = 1 << (m - 1)
 
-    # compute the initial bitvector naively
-    initial_bitvector = compute_initial_bitvector(txt[:m], pat)
+    # compute the initial bitvector from the first m characters
+    initial_bitvector = compute_initial_bitvector(txt, pat, masks)
     prev_bitvector = initial_bitvector
-    # if the initial bitvector is a match, append 0, the starting index
-    if not initial_bitvector[0]:
-        occurrences.append(0)
+    # if the initial bitvector is a match, yield 0, the starting index
+    if initial_bitvector < match_limit:
+        yield offset
 
-    # loop through the remaining text
+    # loop through the remaining text, compute_deltaj and compute_bitvector_from_deltaj are inlined here
+    get_deltaj = masks.get
     for j in range(m, n):
-        # find the delta
-        deltaj = compute_deltaj(txt[j], pat)
-        # find the new bitvector using the delta
-        curr_bitvector = compute_bitvector_from_deltaj(prev_bitvector, deltaj)
+        prev_bitvector = ((prev_bitvector << 1) | get_deltaj(txt[j], all_ones)) & all_ones
 
-        # if the pattern is a match, append the occurrence
-        if not curr_bitvector[0]:
-            occurrences.append(j - m + 1)
+        # if the pattern is a match, yield the occurrence
+        if prev_bitvector < match_limit:
+            yield offset + j - m + 1
 
-        # update prev_bitvector
-        prev_bitvector = curr_bitvector
 
-    # output to the file
-    output_filename = "output_bitwisepm.txt"
-    output_data(occurrences, output_filename)
+def bitwise_pm_bytes(txt_filename: str, pat_filename: str, binary=False):
+    """
+    Byte mode bitwise_pm for binary files. Both files are read as raw bytes and the text is memory mapped, so
+    nothing is decoded or copied and any byte value can appear in the text or the pattern.
+
+    Args:
+        txt_filename (str): the name of the file containing the text
+        pat_filename (str): the name of the file containing the pattern
+        binary (bool): write to "output_bitwisepm.bin" in the varint format instead of as text
+
+    Returns:
+        None
+    """
+
+    with open(pat_filename, 'rb') as pat_file:
+        pat = pat_file.read()
+    output_filename = "output_bitwisepm.bin" if binary else "output_bitwisepm.txt"
+
+    with open(txt_filename, 'rb') as txt_file:
+        # an empty file cannot be memory mapped
+        if os.fstat(txt_file.fileno()).st_size == 0:
+            output_data([], output_filename, binary)
+            return
+        with mmap.mmap(txt_file.fileno(), 0, access=mmap.ACCESS_READ) as txt:
+            with memoryview(txt) as view:
+                output_data(iter_bitwise_search_bytes(view, pat), output_filename, binary)
+
+
+def iter_bitwise_search_bytes(txt, pat: bytes, offset=0, masks=None):
+    """
+    Byte version of iter_bitwise_search. Delta j comes from a 256 entry list indexed by the byte value, and the
+    scan starts from the all ones bitvector so no separate initial bitvector is needed.
+
+    Args:
+        txt: the text, as bytes, bytearray or a memoryview (for example of an mmap)
+        pat (bytes): the pattern
+        offset (int): value added to every occurrence, the position of txt inside a larger text
+        masks (list): delta j of every byte value from compute_byte_masks, computed here if not given
+
+    Returns:
+        yields the starting positions of occurrences of the pattern in the text, in increasing order.
+    """
+
+    m = len(pat)
+    if m == 0 or m > len(txt):
+        return
+
+    if masks is None:
+        masks = compute_byte_masks(pat)
+    all_ones = (1 << m) - 1
+    match_limit = 1 << (m - 1)
+
+    # bit m - 1 needs m updates to become 0, so nothing can match before the first full window
+    prev_bitvector = all_ones
+    j = 0
+    for byte in txt:
+        prev_bitvector = ((prev_bitvector << 1) | masks[byte]) & all_ones
+        if prev_bitvector < match_limit:
+            yield offset + j - m + 1
+        j += 1
+
+
+def parallel_bitwise_pm(txt_filename: str, pat_filename: str, workers=None):
+    """
+    Parallel version of bitwise_pm, the text is split into shards which are searched in a process pool. Like
+    bitwise_pm_bytes the files are read as raw bytes, so the positions are byte offsets, the same as bitwise_pm's
+    for ASCII text.
+
+    Args:
+        txt_filename (str): the name of the file containing the text
+        pat_filename (str): the name of the file containing the pattern
+        workers (int): number of processes to use, defaults to the number of cpus
+
+    Returns:
+        None
+    """
+
+    with open(pat_filename, 'rb') as pat_file:
+        pat = pat_file.read()
+    occurrences = parallel_search(txt_filename, pat, workers)
+    output_data(occurrences, "output_bitwisepm.txt")
+
+
+def parallel_search(txt_filename: str, pat: bytes, workers=None):
+    """
+    Splits the text file into one shard per worker, each overlapping the next by m - 1 bytes so no occurrence is
+    cut in half, and searches the shards in a process pool. Only the offsets of each shard are sent, every worker
+    memory maps the file itself, so the text is never read into or copied out of this process. The pattern masks
+    are computed once here and handed to every worker when it starts.
+
+    Args:
+        txt_filename (str): the name of the file containing the text
+        pat (bytes): the pattern
+        workers (int): number of processes to use, defaults to the number of cpus
+
+    Returns:
+        list: A sorted list of the byte offsets of occurrences of the pattern in the text.
+    """
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    size = os.path.getsize(txt_filename)
+    # an empty file cannot be memory mapped
+    if size == 0:
+        return []
+
+    # every shard starts shard_size bytes after the previous one, the worker reads m - 1 extra bytes past its end
+    shard_size = max(-(-size // workers), 1)
+    shards = [(start, start + shard_size) for start in range(0, size, shard_size)]
+
+    with Pool(workers, initializer=init_worker, initargs=(txt_filename, pat, compute_byte_masks(pat))) as pool:
+        results = pool.starmap(search_shard, shards)
+
+    # every shard only reports occurrences starting before the next shard, so the results are already in order
+    return list(chain.from_iterable(results))
+
+
+def init_worker(txt_filename, pat, masks):
+    """
+    memory maps the text and stores the pattern and its masks in a worker process, so they are set up once per
+    worker
+    Args:
+        txt_filename: the name of the file containing the text
+        pat: the pattern, as bytes
+        masks: delta j of every byte value, from compute_byte_masks
+
+    Returns:
+        None
+    """
+
+    global worker_pattern, worker_text
+    worker_pattern = (pat, masks)
+    with open(txt_filename, 'rb') as txt_file:
+        worker_text = mmap.mmap(txt_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def search_shard(offset: int, end: int):
+    """
+    searches a single shard of the memory mapped text in a worker process
+    Args:
+        offset: position of the shard in the text
+        end: position in the whole text where the next shard starts, occurrences from there on belong to it
+
+    Returns:
+        a list of positions in the whole text where the pattern occurs
+    """
+
+    pat, masks = worker_pattern
+    with memoryview(worker_text)[offset:end + len(pat) - 1] as shard:
+        return list(takewhile(lambda pos: pos < end, iter_bitwise_search_bytes(shard, pat, offset, masks)))
+
+
+def approximate_bitwise_pm(txt_filename: str, pat_filename: str, k, metric="hamming"):
+    """
+    Finds every position in the text where an occurrence of the pattern with at most k errors ends, and writes
+    each end position with its smallest distance to the output file.
+
+    Args:
+        txt_filename (str): the name of the file containing the text
+        pat_filename (str): the name of the file containing the pattern
+        k (int): maximum number of errors allowed
+        metric (str): "hamming" for substitutions only, "levenshtein" for substitutions, insertions and deletions
+
+    Returns:
+        None
+    """
+
+    data = read_input(txt_filename, pat_filename)
+    matches = approximate_search(data[0], data[1], int(k), metric)
+    output_data([str(end) + " " + str(distance) for end, distance in matches], "output_bitwisepm.txt")
+
+
+def approximate_search(txt: str, pat: str, k: int, metric="hamming"):
+    """
+    Wu-Manber style bit-parallel approximate matching. Keeps one bitvector per number of errors d = 0..k, where
+    bitvector d is the usual exact bitvector except that bit i is 0 when pat[:i+1] matches the text ending at the
+    current character with at most d errors. Each text character updates all k + 1 bitvectors, so the scan costs
+    O(n * k) word operations.
+
+    Args:
+        txt (str): the text
+        pat (str): the pattern
+        k (int): maximum number of errors allowed
+        metric (str): "hamming" for substitutions only, "levenshtein" for substitutions, insertions and deletions
+
+    Returns:
+        list: (end position, distance) for every position where an occurrence ends, distance being the smallest
+        number of errors of any occurrence ending there.
+    """
+
+    if metric not in ("hamming", "levenshtein"):
+        raise ValueError("Unsupported metric: {}".format(metric))
+    if k < 0:
+        raise ValueError("k must be at least 0, got {}".format(k))
+
+    m = len(pat)
+    if m == 0:
+        return []
+    masks = compute_masks(pat)
+    all_ones = (1 << m) - 1
+    match_limit = 1 << (m - 1)
+    levenshtein = metric == "levenshtein"
+
+    # with deletions, the first d characters of the pattern can be skipped before the text even starts
+    if levenshtein:
+        bitvectors = [(all_ones << d) & all_ones for d in range(k + 1)]
+    else:
+        bitvectors = [all_ones] * (k + 1)
+
+    matches = []
+    for j in range(len(txt)):
+        deltaj = masks.get(txt[j], all_ones)
+
+        # exact bitvector, same update as bitwise_search
+        prev_lower = bitvectors[0]
+        curr_lower = ((prev_lower << 1) | deltaj) & all_ones
+        bitvectors[0] = curr_lower
+
+        for d in range(1, k + 1):
+            prev = bitvectors[d]
+            # match the character, or substitute it using one more error than bitvector d - 1 had
+            curr = ((prev << 1) | deltaj) & (prev_lower << 1)
+            if levenshtein:
+                # delete a pattern character, or insert the text character
+                curr &= (curr_lower << 1) & prev_lower
+            curr &= all_ones
+            bitvectors[d] = curr
+            prev_lower = prev
+            curr_lower = curr
+
+        # report the smallest distance with a full match ending here
+        for d in range(k + 1):
+            if bitvectors[d] < match_limit:
+                matches.append((j, d))
+                break
+
+    return matches
+
+
+def multi_bitwise_pm(txt_filename: str, pats_filename: str):
+    """
+    Searches for every pattern in a file (one pattern per line) in a single pass over the text and writes each
+    occurrence as "pattern_id offset", pattern_id being the line number of the pattern starting from 0.
+
+    Args:
+        txt_filename (str): the name of the file containing the text
+        pats_filename (str): the name of the file containing the patterns, one per line
+
+    Returns:
+        None
+    """
+
+    data = read_input(txt_filename, pats_filename)
+    occurrences = multi_pattern_search(data[0], data[1].splitlines())
+    output_data([str(pattern_id) + " " + str(offset) for pattern_id, offset in occurrences], "output_bitwisepm.txt")
+
+
+def multi_pattern_search(txt: str, patterns: list):
+    """
+    Searches for many short patterns in one pass over the text. Patterns are grouped by length and the bitvectors
+    of each group are packed side by side into a single int, so one shift and one OR update every pattern in the
+    group at once.
+
+    Args:
+        txt (str): the text
+        patterns (list): the patterns, empty patterns are ignored
+
+    Returns:
+        list: (pattern_id, offset) for every occurrence, pattern_id being the index of the pattern in patterns,
+        sorted by offset and then pattern_id.
+    """
+
+    # group the pattern ids by pattern length
+    groups = {}
+    for pattern_id in range(len(patterns)):
+        m = len(patterns[pattern_id])
+        if m > 0:
+            groups.setdefault(m, []).append(pattern_id)
 
+    packed = []
+    for m, pattern_ids in groups.items():
+        masks, keep_mask, top_bits = compute_packed_masks([patterns[i] for i in pattern_ids])
+        packed.append([m, pattern_ids, masks, keep_mask, top_bits, keep_mask])
 
-def compute_delta(txt_char, pat_char):
+    occurrences = []
+    for j in range(len(txt)):
+        char = txt[j]
+        for group in packed:
+            m, pattern_ids, masks, keep_mask, top_bits, prev_bitvector = group
+            curr_bitvector = ((prev_bitvector << 1) | masks.get(char, keep_mask)) & keep_mask
+            group[5] = curr_bitvector
+
+            # a pattern matches when the top bit of its block is 0, a full window is needed before that can happen
+            matched = ~curr_bitvector & top_bits
+            while matched:
+                lowest = matched & -matched
+                block = (lowest.bit_length() - 1) // (m + 1)
+                occurrences.append((pattern_ids[block], j - m + 1))
+                matched ^= lowest
+
+    occurrences.sort(key=lambda occurrence: (occurrence[1], occurrence[0]))
+    return occurrences
+
+
+def compute_packed_masks(patterns: list):
     """
-    compares 2 characters, returns 1 if its not a match, 0 otherwise
+    computes the packed delta j of every character for a group of patterns of the same length m. Pattern b uses
+    bits b * (m + 1) to b * (m + 1) + m - 1, followed by a separator bit that is always cleared so the top bit of
+    one block never shifts into the next block
     Args:
-        txt_char: character from text
-        pat_char: character from pattern
+        patterns: patterns of the same length
 
     Returns:
-        1 if its not a match, 0 otherwise
+        a dict from character to packed delta j, the mask of all non separator bits (also the delta j of
+        characters in none of the patterns) and the mask of the top bit of every block
     """
 
-    return 1 if txt_char != pat_char else 0
+    m = len(patterns[0])
+    block_ones = (1 << m) - 1
+    keep_mask = 0
+    top_bits = 0
+    for block in range(len(patterns)):
+        keep_mask |= block_ones << (block * (m + 1))
+        top_bits |= 1 << (block * (m + 1) + m - 1)
 
+    masks = {}
+    for block in range(len(patterns)):
+        block_masks = compute_masks(patterns[block])
+        for char in block_masks:
+            # clear the bits of this block where the pattern has char, other blocks are left as they are
+            matching_bits = (~block_masks[char] & block_ones) << (block * (m + 1))
+            masks[char] = masks.get(char, keep_mask) & ~matching_bits
 
-def compute_initial_bitvector(txt, pat):
+    return masks, keep_mask, top_bits
+
+
+def compute_initial_bitvector(txt, pat, masks=None):
     """
-    computes the initial bitvector naively
+    computes the initial bitvector in O(m) by starting from all ones (nothing matches yet) and feeding the first m
+    characters of the text through the same update used in the main loop
     Args:
-        txt: text
+        txt: text, only the first m characters are used
         pat: pattern
+        masks: delta j of every character in the pattern, computed from pat if not given
 
     Returns:
-        bitvector with the inital values
+        bitvector with the inital values, as an int
     """
 
-    # initialize values. New bitvector
     m = len(pat)
-    initial_bitvector = bitarray([0] * m)
-    # the length of the bitvector is always m, that is the number of iterations we need
-    for iteration in range(m):
-        # carry out comparisons
-        for i in range(m-iteration):
-            compare = compute_delta(txt[i+iteration], pat[i])
-            if compare == 1:
-                initial_bitvector[iteration] = 1
+    if masks is None:
+        masks = compute_masks(pat)
+    all_ones = (1 << m) - 1
+
+    initial_bitvector = all_ones
+    for i in range(m):
+        deltaj = compute_deltaj(txt[i], masks, all_ones)
+        initial_bitvector = compute_bitvector_from_deltaj(initial_bitvector, deltaj, all_ones)
 
     # return the bitvector
     return initial_bitvector
 
 
-def compute_deltaj(txt_char, pat):
+def compute_masks(pat):
     """
-    calculates delta by comparing every character in pattern with the next character in text
+    precomputes delta j for every distinct character in the pattern, so the text can be scanned without comparing
+    each text character against the whole pattern
+    Args:
+        pat: the pattern
+
+    Returns:
+        a dict from character to its delta j, as an int where bit i is 1 if pat[i] is a different character
+    """
+
+    m = len(pat)
+    all_ones = (1 << m) - 1
+    masks = {}
+    for i in range(m):
+        # clear bit i in the mask of the character found at position i
+        masks[pat[i]] = masks.get(pat[i], all_ones) & ~(1 << i)
+    return masks
+
+
+def compute_byte_masks(pat: bytes):
+    """
+    byte version of compute_masks, delta j for all 256 byte values
     Args:
-        txt_char: character in text
         pat: the pattern
 
     Returns:
-        a bitvector with the delta j
+        a list of 256 ints, entry b is delta j of byte value b
     """
 
     m = len(pat)
-    deltaj = bitarray()
-    for i in range(m, 0, -1):
-        deltaj.append(compute_delta(txt_char, pat[i-1]))
-    return deltaj
+    masks = [(1 << m) - 1] * 256
+    for i in range(m):
+        masks[pat[i]] &= ~(1 << i)
+    return masks
+
 
+def compute_deltaj(txt_char, masks, all_ones):
+    """
+    looks up delta j for a character of the text
+    Args:
+        txt_char: character in text
+        masks: delta j of every character in the pattern, from compute_masks
+        all_ones: delta j of characters that are not in the pattern, (1 << m) - 1
 
-def compute_bitvector_from_deltaj(prev_bitvector, deltaj):
+    Returns:
+        delta j as an int
+    """
+
+    return masks.get(txt_char, all_ones)
+
+
+def compute_bitvector_from_deltaj(prev_bitvector, deltaj, all_ones):
     """
     calculates the next bitvector using the previous bitvector and delta j and performing calculations
     Args:
         prev_bitvector: the previous bitvector
         deltaj: delta j
+        all_ones: (1 << m) - 1, keeps the bitvector m bits long
 
     Returns:
         next bitvector
     """
 
-    # shifts the bitvector to the left by one
-    shifted_bitvector = prev_bitvector[1:]
-    shifted_bitvector.append(False)
-
-    # carries out OR function between the shifted bitvector and delta j
-    new_bitvector = shifted_bitvector | deltaj
-
-    # returns the new bitvector
-    return new_bitvector
+    # shifts the bitvector by one, carries out OR function with delta j and drops the bit shifted out
+    return ((prev_bitvector << 1) | deltaj) & all_ones
 
 
 def read_input(txt_filename: str, pat_filename: str):
@@ -156,28 +565,110 @@ def read_input(txt_filename: str, pat_filename: str):
     return txt, pat
 
 
-def output_data(data: list, output_filename: str):
+def output_data(data, output_filename: str, binary=False):
     """
-    when given a list and a filename, outputs each element on a new line in the specified file
+    when given a list (or any iterable) and a filename, outputs each element on a new line in the specified file.
+    Elements are written through a large buffer as they arrive, so a generator is never materialised
     Args:
-        data: a list containing the data
+        data: a list or generator containing the data
         output_filename: the name of the file where the data has to be output
+        binary: write the data with write_varints instead, data must then be increasing non-negative ints
 
     Returns:
         None
     """
 
-    with open(output_filename, "w") as file:
-        for element in data:
-            file.write(str(element) + "\n")
+    if binary:
+        write_varints(data, output_filename)
+    else:
+        with open(output_filename, "w", buffering=OUTPUT_BUFFER_SIZE) as file:
+            file.writelines(str(element) + "\n" for element in data)
 
     # informs user when data has been written to the file
     print("Data written to: " + output_filename)
 
 
+def write_varints(data, output_filename: str):
+    """
+    writes increasing non-negative ints in the compact binary format: the VARINT_MAGIC header followed by the gap
+    between each element and the one before it (the first element is its own gap), each gap as an unsigned LEB128
+    varint, 7 bits per byte with the top bit set on every byte but the last
+    Args:
+        data: a list or generator of increasing non-negative ints
+        output_filename: the name of the file where the data has to be output
+
+    Returns:
+        None
+    """
+
+    with open(output_filename, "wb") as file:
+        file.write(VARINT_MAGIC)
+        buffer = bytearray()
+        prev = 0
+        for element in data:
+            gap = element - prev
+            if gap < 0:
+                raise ValueError("varint output needs increasing values, got {} after {}".format(element, prev))
+            prev = element
+            while gap >= 0x80:
+                buffer.append((gap & 0x7f) | 0x80)
+                gap >>= 7
+            buffer.append(gap)
+
+            if len(buffer) >= OUTPUT_BUFFER_SIZE:
+                file.write(buffer)
+                buffer.clear()
+        file.write(buffer)
+
+
+def read_varints(input_filename: str):
+    """
+    reads a file written by write_varints, OUTPUT_BUFFER_SIZE bytes at a time
+    Args:
+        input_filename: name of the file to read
+
+    Returns:
+        yields the original ints, in order
+    """
+
+    with open(input_filename, "rb") as file:
+        if file.read(len(VARINT_MAGIC)) != VARINT_MAGIC:
+            raise ValueError("{} is not a varint output file".format(input_filename))
+        prev = 0
+        gap = 0
+        shift = 0
+        while True:
+            chunk = file.read(OUTPUT_BUFFER_SIZE)
+            if not chunk:
+                break
+            # a varint may continue into the next chunk, so gap and shift carry over
+            for byte in chunk:
+                gap |= (byte & 0x7f) << shift
+                if byte & 0x80:
+                    shift += 7
+                else:
+                    prev += gap
+                    yield prev
+                    gap = 0
+                    shift = 0
+        if shift:
+            raise ValueError("{} ends in the middle of a varint".format(input_filename))
+
+
 if __name__ == "__main__":
-    if len(sys.argv) != 3:
-        print("Usage: python your_script.py txt_file pat_file")
+    if len(sys.argv) == 4 and sys.argv[3] == "--parallel":
+        parallel_bitwise_pm(sys.argv[1], sys.argv[2])
+    elif len(sys.argv) == 5 and sys.argv[3] in ("--hamming", "--levenshtein"):
+        approximate_bitwise_pm(sys.argv[1], sys.argv[2], sys.argv[4], sys.argv[3][2:])
+    elif len(sys.argv) == 4 and sys.argv[3] == "--multi":
+        multi_bitwise_pm(sys.argv[1], sys.argv[2])
+    elif len(sys.argv) == 4 and sys.argv[3] == "--binary":
+        bitwise_pm(sys.argv[1], sys.argv[2], binary=True)
+    elif len(sys.argv) == 4 and sys.argv[3] == "--bytes":
+        bitwise_pm_bytes(sys.argv[1], sys.argv[2])
+    elif len(sys.argv) != 3:
+        print("Usage: python your_script.py txt_file pat_file "
+              "[--parallel | --multi | --binary | --bytes | --hamming k | --levenshtein k]")
     else:
         txt_file = sys.argv[1]
         pat_file = sys.argv[2]
@@ -0,0 +1,106 @@
+import os
+import sys
+
+import numpy as np
+
+
+# number of text positions checked at a time, bounds the memory used by the candidate arrays
+BLOCK_SIZE = 1 << 22
+
+
+def vector_pm(txt_filename: str, pat_filename: str, block_size=BLOCK_SIZE):
+    """
+    Vectorized exact pattern matching for byte texts. The text is memory mapped and searched block by block, so
+    only a few block sized arrays are ever in memory.
+
+    Args:
+        txt_filename (str): the name of the file containing the text
+        pat_filename (str): the name of the file containing the pattern
+        block_size (int): number of text positions checked at a time
+
+    Returns:
+        None
+    """
+
+    with open(pat_filename, 'rb') as pat_file:
+        pat = pat_file.read()
+
+    # np.memmap cannot map an empty file
+    if os.path.getsize(txt_filename) == 0:
+        occurrences = []
+    else:
+        txt = np.memmap(txt_filename, dtype=np.uint8, mode='r')
+        occurrences = vector_search(txt, pat, block_size)
+
+    output_data(occurrences, "output_vectorpm.txt")
+
+
+def vector_search(txt, pat: bytes, block_size=BLOCK_SIZE):
+    """
+    Finds every occurrence of the pattern in the text. For each block of start positions, a boolean candidate array
+    is built from text == pat[0] and ANDed with the text shifted by i compared against pat[i], for every position
+    i of the pattern. Blocks overlap by m - 1 bytes so no occurrence is cut in half.
+
+    Args:
+        txt: the text, as bytes or a uint8 numpy array (such as a np.memmap)
+        pat (bytes): the pattern
+        block_size (int): number of text positions checked at a time
+
+    Returns:
+        list: A list containing the starting positions of occurrences of the pattern in the text.
+    """
+
+    if isinstance(txt, (bytes, bytearray, memoryview)):
+        txt = np.frombuffer(txt, dtype=np.uint8)
+    n = len(txt)
+    m = len(pat)
+
+    # if the pattern is longer than the text, there are no occurrences
+    if m == 0 or m > n:
+        return []
+
+    occurrences = []
+    last_start = n - m
+    for block_start in range(0, last_start + 1, block_size):
+        # number of start positions in this block
+        length = min(block_size, last_start + 1 - block_start)
+        block = txt[block_start:block_start + length + m - 1]
+
+        candidates = block[:length] == pat[0]
+        for i in range(1, m):
+            # stop early once no candidate is left in this block
+            if not candidates.any():
+                break
+            candidates &= block[i:i + length] == pat[i]
+
+        occurrences.extend((np.flatnonzero(candidates) + block_start).tolist())
+
+    return occurrences
+
+
+def output_data(data: list, output_filename: str):
+    """
+    when given a list and a filename, outputs each element on a new line in the specified file
+    Args:
+        data: a list containing the data
+        output_filename: the name of the file where the data has to be output
+
+    Returns:
+        None
+    """
+
+    with open(output_filename, "w") as file:
+        for element in data:
+            file.write(str(element) + "\n")
+
+    # informs user when data has been written to the file
+    print("Data written to: " + output_filename)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python your_script.py txt_file pat_file")
+    else:
+        txt_file = sys.argv[1]
+        pat_file = sys.argv[2]
+        vector_pm(txt_file, pat_file)
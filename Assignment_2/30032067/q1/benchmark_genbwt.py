@@ -0,0 +1,191 @@
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from genbwt import (block_bwt, generate_bwt, generate_suffix_array, generate_suffix_tree, generate_trie,
+                    generate_trie_arrays, load_suffix_tree, save_suffix_tree)
+from inverse_bwt import inverse_bwt
+
+
+ENGLISH_WORDS = ("the", "of", "and", "to", "in", "is", "that", "for", "it", "as", "was", "with", "suffix", "array",
+                 "tree", "string", "block", "sorting", "transform")
+# latin-1, multi-byte and astral characters, so the round trip covers every utf-8 sequence length
+UNICODE_WORDS = ("héllo", "wörld", "naïve", "€uro", "日本語", "𝄞clef")
+
+
+def measure(func, *args):
+    """
+    runs func twice, once timed and once under tracemalloc, since tracing slows it down
+    Args:
+        func: function to run
+        args: arguments for func
+
+    Returns:
+        time taken in seconds and peak memory allocated in bytes
+    """
+
+    start = time.perf_counter()
+    func(*args)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    func(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def benchmark_storage(max_length=10 ** 5):
+    """
+    compares building the trie from Node and Edge objects against building an ArrayTree, and both against building
+    the suffix array directly with SA-IS, for random DNA strings of length 10^3 up to max_length
+    Args:
+        max_length: length of the longest string
+
+    Returns:
+        None
+    """
+
+    random.seed(0)
+    print("n,storage,seconds,peak_bytes,bytes_per_char")
+    n = 10 ** 3
+    while n <= max_length:
+        string = "".join(random.choices("acgt", k=n)) + "$"
+        for storage, func in (("objects", generate_trie), ("arrays", generate_trie_arrays),
+                              ("sais", lambda string, n: generate_suffix_array(string))):
+            elapsed, peak = measure(func, string, len(string))
+            print(f"{n},{storage},{elapsed:.4f},{peak},{peak / len(string):.1f}")
+        n *= 10
+
+
+def benchmark_roundtrip(max_length=10 ** 6):
+    """
+    builds the bwt of random english-like text (words, spaces and newlines) of length 10^3 up to max_length with
+    SA-IS, inverts it from disk with inverse_bwt and checks the text comes back unchanged. Every length is run once
+    with ASCII words and once with words outside ASCII, which genbwt.py writes as multi-byte characters
+    Args:
+        max_length: length of the longest string
+
+    Returns:
+        None
+    """
+
+    random.seed(0)
+    print("n,alphabet,bwt_seconds,inverse_seconds,inverse_peak_bytes,round_trip")
+    n = 10 ** 3
+    with tempfile.TemporaryDirectory() as directory:
+        bwt_path = os.path.join(directory, "bwt.txt")
+        text_path = os.path.join(directory, "text.txt")
+        while n <= max_length:
+            for alphabet, words in (("ascii", ENGLISH_WORDS), ("unicode", ENGLISH_WORDS + UNICODE_WORDS)):
+                string = generate_english(n, words) + "$"
+                start = time.perf_counter()
+                bwt = generate_bwt(string, generate_suffix_array(string))
+                bwt_seconds = time.perf_counter() - start
+                with open(bwt_path, 'w', newline='') as file:
+                    file.write(bwt)
+
+                elapsed, peak = measure(inverse_bwt, bwt_path, text_path)
+                with open(text_path, 'r', newline='') as file:
+                    round_trip = file.read() == string[:-1]
+                print(f"{n},{alphabet},{bwt_seconds:.4f},{elapsed:.4f},{peak},{round_trip}")
+            n *= 10
+
+
+def generate_english(n: int, words=ENGLISH_WORDS):
+    """
+    generates n characters of random english-like text, words separated by spaces with a newline every few words
+    Args:
+        n: length of the text
+        words: words to pick from
+
+    Returns:
+        the text
+    """
+
+    parts = []
+    length = 0
+    while length < n:
+        part = random.choice(words) + random.choice("      \n")
+        parts.append(part)
+        length += len(part)
+    return "".join(parts)[:n]
+
+
+def benchmark_blocks(length=4 * 10 ** 6, max_workers=None):
+    """
+    times block_bwt on a random DNA file of the given length with 1 up to max_workers processes
+    Args:
+        length: length of the input file
+        max_workers: largest number of processes, defaults to the number of cpus
+
+    Returns:
+        None
+    """
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    random.seed(0)
+    print("workers,seconds,chars_per_second")
+    with tempfile.TemporaryDirectory() as directory:
+        text_path = os.path.join(directory, "text.txt")
+        with open(text_path, 'w') as file:
+            file.write("".join(random.choices("acgt", k=length)))
+
+        for workers in range(1, max_workers + 1):
+            start = time.perf_counter()
+            block_bwt(text_path, workers=workers, output_path=os.path.join(directory, "text.bwb"))
+            elapsed = time.perf_counter() - start
+            print(f"{workers},{elapsed:.4f},{length / elapsed:.0f}")
+
+
+def benchmark_tree_io(max_length=10 ** 6):
+    """
+    compares building a SuffixTree with saving it and memory mapping it back, for random DNA strings of length
+    10^3 up to max_length. The first query after loading is timed too, as it is the first to touch the pages
+    Args:
+        max_length: length of the longest string
+
+    Returns:
+        None
+    """
+
+    random.seed(0)
+    print("n,build_seconds,save_seconds,load_seconds,first_query_seconds,file_bytes")
+    n = 10 ** 3
+    with tempfile.TemporaryDirectory() as directory:
+        tree_path = os.path.join(directory, "tree.st")
+        while n <= max_length:
+            string = "".join(random.choices("acgt", k=n))
+            start = time.perf_counter()
+            suffix_tree = generate_suffix_tree(string)
+            build_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            save_suffix_tree(tree_path, suffix_tree)
+            save_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            loaded = load_suffix_tree(tree_path)
+            load_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            loaded.count(string[n // 2:n // 2 + 12])
+            query_seconds = time.perf_counter() - start
+            print(f"{n},{build_seconds:.4f},{save_seconds:.4f},{load_seconds:.6f},{query_seconds:.6f},"
+                  f"{os.path.getsize(tree_path)}")
+            loaded.close()
+            del suffix_tree, loaded
+            n *= 10
+
+
+if __name__ == "__main__":
+    benchmarks = {"storage": benchmark_storage, "roundtrip": benchmark_roundtrip, "blocks": benchmark_blocks,
+                  "tree_io": benchmark_tree_io}
+    if len(sys.argv) < 2 or sys.argv[1] not in benchmarks:
+        print("Usage: python benchmark_genbwt.py storage|roundtrip|blocks|tree_io [max_length | length max_workers]")
+    else:
+        benchmarks[sys.argv[1]](*[int(arg) for arg in sys.argv[2:]])
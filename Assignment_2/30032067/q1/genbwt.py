@@ -1,13 +1,64 @@
+import json
+import mmap
+import os
+import struct
 import sys
-
-
-def ukkonen(file_path: str):
+import time
+import tracemalloc
+from array import array
+from bisect import bisect_right
+from collections import deque
+from multiprocessing import Pool
+
+
+# FM-index file layout, shared with hdbwtpm.py. All numbers are little endian and every section after the header
+# starts on an 8 byte boundary:
+#   header       magic, version, n, sigma, checkpoint interval, suffix array sample rate
+#   alphabet     the sigma distinct characters of the bwt in sorted order, one byte each, '$' (the sentinel) first
+#   C            uint32 per alphabet character, number of bwt characters smaller than it
+#   bwt          n bytes
+#   checkpoints  (n // interval + 1) rows of sigma uint32, row r counts each character in bwt[:r * interval]
+#   sa samples   uint32 suffix_array[i] for every i that is a multiple of the sample rate
+FM_INDEX_MAGIC = b"FMI1"
+FM_INDEX_VERSION = 1
+FM_INDEX_HEADER = struct.Struct("<4sHHQIII")
+CHECKPOINT_INTERVAL = 64
+SA_SAMPLE_RATE = 32
+
+# block bwt container, written by block_bwt and read back by inverse_bwt.py, also little endian:
+#   header       magic, version, block size, n, number of blocks
+#   block index  per block the file offset and length of its bwt and the row of its sentinel (bzip2's origPtr)
+#   blocks       the bwt of every block in input order, with the sentinel's row left out so any byte can occur
+BLOCK_BWT_MAGIC = b"BWB1"
+BLOCK_BWT_VERSION = 2
+BLOCK_BWT_HEADER = struct.Struct("<4sHHQQI")
+BLOCK_INDEX_ENTRY = struct.Struct("<QII")
+BLOCK_SIZE = 900000
+
+# suffix tree file layout, written by save_suffix_tree and memory mapped by load_suffix_tree. Little endian, every
+# section after the header starts on an 8 byte boundary:
+#   header       magic, version, kind (0 for a SuffixTree over Latin-1 text, 1 for a GeneralizedSuffixTree, 2 for
+#                a SuffixTree over any other text), number of nodes, length of the text, number of documents
+#   text         one byte per character for kind 0, one int32 character code per character for kinds 1 and 2
+#   nodes        int32 per node for each of start, end, first_child, next_sibling, link, depth and leaf_count
+#   documents    kind 1 only, int32 doc_starts per document and int32 leaf_doc per node
+SUFFIX_TREE_MAGIC = b"STR1"
+SUFFIX_TREE_VERSION = 2
+SUFFIX_TREE_HEADER = struct.Struct("<4sHHQQI")
+
+
+def ukkonen(file_path: str, storage="objects", index_path=None, lcp_path=None, tree_path=None, stats_path=None):
     """
     uses ukkonen to first generate a trie in O(N) time, then generate a suffix array in O(N) time and finally
     generate a bwt in O(N) time for a total complexity of O(3N) --> O(N)
 
     Args:
         file_path: file path with string to convert into bwt
+        storage: "objects" to build the trie out of Node and Edge objects, "arrays" to build an ArrayTree
+        index_path: if given, an FM-index of the bwt is also written here with write_fm_index
+        lcp_path: if given, the LCP array is also written here with write_lcp_array
+        tree_path: if given, the trie is also written here with save_suffix_tree, needs storage "arrays"
+        stats_path: if given, the construction is profiled and its ConstructionStats are written here as json
 
     Returns:
         none
@@ -18,22 +69,87 @@ def ukkonen(file_path: str):
     string = read_file_as_string(file_path) + '$'
     n = len(string)
 
+    if storage not in ("arrays", "objects"):
+        raise ValueError("Unsupported storage: {}".format(storage))
+    # the tries order children by character, and the object trie has a slot for each of '$' to '~'
+    if n > 1 and (min(string[:-1]) <= '$' or (storage == "objects" and max(string) > '~')):
+        raise ValueError("ukkonen needs every character of {} to come after '$'{}, use sais for other input".format(
+            file_path, " and up to '~'" if storage == "objects" else ""))
+    stats = None
+    if stats_path is not None:
+        stats = ConstructionStats(storage, n)
+        tracemalloc.start()
+        start = time.perf_counter()
+
     # generate and use trie to find suffix array and hence bwt
-    trie = generate_trie(string, n)
-    suffix_array = trie.get_suffix_array()
-    bwt = generate_bwt(string, suffix_array)
+    if storage == "arrays":
+        trie = generate_trie_arrays(string, n, stats=stats)
+    else:
+        trie = generate_trie(string, n, stats)
+
+    if stats is not None:
+        stats.seconds = time.perf_counter() - start
+        stats.peak_bytes = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        stats.dump(stats_path)
+    if tree_path is not None:
+        if storage != "arrays":
+            raise ValueError("Only an ArrayTree can be saved, use storage \"arrays\"")
+        save_suffix_tree(tree_path, SuffixTree(trie))
+
+    # the suffix array is only kept around when the index or the LCP array need it
+    if index_path is None and lcp_path is None:
+        bwt = generate_bwt(string, trie.iter_suffix_array())
+    else:
+        suffix_array = trie.get_suffix_array()
+        bwt = generate_bwt(string, suffix_array)
+        if index_path is not None:
+            write_fm_index(index_path, bwt, suffix_array)
+        if lcp_path is not None:
+            write_lcp_array(lcp_path, kasai(string, suffix_array))
 
     # write bwt to file
     output_path = "output_genbwt.txt"
     write_string_to_file(file_path=output_path, content=str(bwt))
 
 
-def generate_trie(string: str, n: int):
+def sais(file_path: str, index_path=None, lcp_path=None):
+    """
+    same output as ukkonen, but the suffix array comes from generate_suffix_array (SA-IS) instead of a suffix
+    trie, which needs far less memory on large inputs
+
+    Args:
+        file_path: file path with string to convert into bwt
+        index_path: if given, an FM-index of the bwt is also written here with write_fm_index
+        lcp_path: if given, the LCP array is also written here with write_lcp_array
+
+    Returns:
+        none
+    """
+
+    string = read_file_as_string(file_path)
+    # a '$' inside the text would be indistinguishable from the sentinel in the bwt
+    if '$' in string:
+        raise ValueError("{} contains '$', which is reserved for the sentinel".format(file_path))
+    string += '$'
+    suffix_array = generate_suffix_array(string)
+    bwt = generate_bwt(string, suffix_array)
+    if index_path is not None:
+        write_fm_index(index_path, bwt, suffix_array)
+    if lcp_path is not None:
+        write_lcp_array(lcp_path, kasai(string, suffix_array))
+
+    output_path = "output_genbwt.txt"
+    write_string_to_file(file_path=output_path, content=bwt)
+
+
+def generate_trie(string: str, n: int, stats=None):
     """
     generates a suffix trie using ukkonen in O(N)
     Args:
         string: string to use for generating the suffix trie
         n: length of string
+        stats: ConstructionStats to count what the construction does in, if given
 
     Returns:
         the root node of the trie
@@ -65,6 +181,9 @@ def generate_trie(string: str, n: int):
             # make a suffix string for easier comparison
             suffix_rep = (j, i)
             suffix = string[index_pointer: suffix_rep[1] + 1]
+            if stats is not None:
+                stats.slices += 1
+                stats.slice_bytes += sys.getsizeof(suffix)
 
             # if the edge already exists
             if active_edge is not None:
@@ -72,6 +191,9 @@ def generate_trie(string: str, n: int):
                 # create a string to represent the data inside the edge for easier representation
                 edge_rep = active_edge.edge_rep
                 edge_data = string[edge_rep[0]:int(edge_rep[1]) + 1]
+                if stats is not None:
+                    stats.slices += 1
+                    stats.slice_bytes += sys.getsizeof(edge_data)
 
                 # checks if there was a mismatch or not
                 mismatch = True
@@ -90,6 +212,10 @@ def generate_trie(string: str, n: int):
 
                         # set show stopper to true, break the while loop comparison
                         show_stopper = True
+                        if stats is not None:
+                            stats.rule_3_exits += 1
+                            if active_length == 0:
+                                stats.skip_count_steps += 1
                         mismatch = False
                         break
 
@@ -101,6 +227,8 @@ def generate_trie(string: str, n: int):
 
                         # mismatch is False, reset everything for next node
                         mismatch = False
+                        if stats is not None:
+                            stats.skip_count_steps += 1
                         index_pointer = index_pointer + active_length
                         active_length = 0
                         break
@@ -121,6 +249,9 @@ def generate_trie(string: str, n: int):
                     elif active_edge.is_leaf:
                         new_edge_1 = Edge(parent=new_node, edge_rep=(edge_rep[0] + active_length, global_end),
                                           suffix_id=active_edge.id)
+                    if stats is not None:
+                        stats.nodes_created += 1
+                        stats.edges_created += 2
 
                     # link previous node to the newly created one
                     if prev_node is not None:
@@ -150,6 +281,8 @@ def generate_trie(string: str, n: int):
                     elif active_node.link is not root and active_node.link is not None:
                         active_node = active_node.link
                         active_edge = active_node.edges[ord(string[index_pointer]) - 36]
+                        if stats is not None:
+                            stats.suffix_link_jumps += 1
                         j += 1
                         active_length = 0
 
@@ -158,8 +291,15 @@ def generate_trie(string: str, n: int):
 
             # rule 2 (base), if edge doesnt exist, create it
             elif active_edge is None:
+                # the node created in the previous extension links to the node this extension ends at
+                if prev_node is not None:
+                    prev_node.update_link(active_node)
+                    prev_node = None
+
                 # create a new edge
                 new_edge = Edge(parent=active_node, edge_rep=(index_pointer + active_length, global_end), suffix_id=j)
+                if stats is not None:
+                    stats.edges_created += 1
                 # add edge to active node
                 index = ord(string[index_pointer]) - 36
                 active_node.edges[index] = new_edge
@@ -174,12 +314,13 @@ def generate_trie(string: str, n: int):
                 # if there a suffix link exists, jump there
                 elif active_node.link is not root and active_node.link is not None:
                     active_node = active_node.link
-                    active_edge = active_node.edges[ord(string[suffix_rep[0]]) - 36]
                     j += 1
+                    if stats is not None:
+                        stats.suffix_link_jumps += 1
 
-                # if string has not ended, move to next node
+                # if string has not ended, move to next node. The rest of the suffix starts at index_pointer
                 if j < n:
-                    index = ord(string[j]) - 36
+                    index = ord(string[index_pointer]) - 36
                     active_edge = active_node.edges[index]
 
             # if show stopper is encountered at any point, stop everything and move to the next phase.
@@ -188,27 +329,739 @@ def generate_trie(string: str, n: int):
     return root
 
 
-def generate_bwt(string: str, suffix_array: list[int]):
+def generate_trie_arrays(string: str, n: int, tree=None, stats=None):
+    """
+    generates the same suffix trie as generate_trie in O(N), but stored in an ArrayTree instead of Node and Edge
+    objects. Walking down the tree uses skip/count on the edge lengths instead of comparing the suffix again
+    Args:
+        string: string to use for generating the suffix trie, ending in a unique '$'
+        n: length of string
+        tree: empty ArrayTree over string to build into, a new ArrayTree by default
+        stats: ConstructionStats to count what the construction does in, if given
+
+    Returns:
+        the ArrayTree, the root is node 0
+    """
+
+    if tree is None:
+        tree = ArrayTree(string)
+    start = tree.start
+    end = tree.end
+    link = tree.link
+
+    # active point, active_edge is the index in string of the first character of the active edge
+    active_node = 0
+    active_edge = 0
+    active_length = 0
+    # number of suffixes still to be added explicitly
+    remainder = 0
+
+    for i in range(n):
+        char = string[i]
+        remainder += 1
+        prev_node = -1
+        while remainder > 0:
+            if active_length == 0:
+                active_edge = i
+            child = tree.find_child(active_node, string[active_edge])
+
+            # rule 2 (base), no edge starts with the character, add a leaf to the active node
+            if child == -1:
+                tree.add_node(active_node, i, -1, i - remainder + 1)
+                if prev_node != -1:
+                    link[prev_node] = active_node
+                    prev_node = -1
+                if stats is not None:
+                    stats.nodes_created += 1
+                    stats.edges_created += 1
+
+            else:
+                # skip/count, if the active length covers the whole edge, move on to the child
+                edge_end = end[child] if end[child] != -1 else i + 1
+                edge_length = edge_end - start[child]
+                if active_length >= edge_length:
+                    active_node = child
+                    active_edge += edge_length
+                    active_length -= edge_length
+                    if stats is not None:
+                        stats.skip_count_steps += 1
+                    continue
+
+                # rule 3, the character is already there, stop the phase
+                if string[start[child] + active_length] == char:
+                    if prev_node != -1 and active_node != 0:
+                        link[prev_node] = active_node
+                    active_length += 1
+                    if stats is not None:
+                        stats.rule_3_exits += 1
+                    break
+
+                # rule 2a, split the edge with a new internal node and hang a leaf off it
+                split = tree.split_edge(active_node, child, active_length)
+                tree.add_node(split, i, -1, i - remainder + 1)
+                if prev_node != -1:
+                    link[prev_node] = split
+                prev_node = split
+                if stats is not None:
+                    # the split node and the leaf, the edge into child is shortened rather than replaced
+                    stats.nodes_created += 2
+                    stats.edges_created += 2
+
+            remainder -= 1
+            # move to the next shorter suffix, through the suffix link if there is one
+            if active_node == 0 and active_length > 0:
+                active_length -= 1
+                active_edge = i - remainder + 1
+            elif active_node != 0:
+                active_node = link[active_node]
+                if stats is not None:
+                    stats.suffix_link_jumps += 1
+
+    return tree
+
+
+def generate_suffix_tree(string: str):
+    """
+    builds a queryable suffix tree of string with generate_trie_arrays
+    Args:
+        string: string to index, without the '$'
+
+    Returns:
+        a SuffixTree
+    """
+
+    # a '$' inside the string would end suffixes early and hide the occurrences that run across it
+    if '$' in string:
+        raise ValueError("string contains '$', which is reserved for the sentinel")
+    string += '$'
+    return SuffixTree(generate_trie_arrays(string, len(string)))
+
+
+def longest_common_substring(a: str, b: str):
+    """
+    finds the longest common substring of two texts with a generalized suffix tree, in O(|a| + |b|)
+    Args:
+        a: first text
+        b: second text
+
+    Returns:
+        the longest substring of both, empty if there is none
+    """
+
+    return generate_generalized_trie([a, b]).longest_common_substring()
+
+
+def generate_generalized_trie(documents):
+    """
+    generates one suffix trie over every document in O(N), N being their total length. The documents are joined
+    into a single sequence of character codes, each followed by its own terminator -1 - doc_id, which is unique
+    and sorts before every character the way '$' does. Since no terminator repeats, no path inside the trie
+    crosses from one document into the next, and every suffix of every document ends up as a leaf
+    Args:
+        documents: iterable of strings
+
+    Returns:
+        a GeneralizedSuffixTree
+    """
+
+    text = array('i')
+    doc_starts = array('i')
+    for doc_id, document in enumerate(documents):
+        doc_starts.append(len(text))
+        text.extend(map(ord, document))
+        text.append(-1 - doc_id)
+    tree = generate_trie_arrays(text, len(text), GeneralizedArrayTree(text))
+    return GeneralizedSuffixTree(tree, doc_starts)
+
+
+def generate_bwt(string: str, suffix_array):
     """
     generates the burrows wheeler transform string using the suffix array in O(N) time
     Args:
         string: string to convert into BWT
-        suffix_array: suffix array of the string
+        suffix_array: suffix array of the string, a list or a generator such as iter_suffix_array()
     Returns:
         bwt string
     """
 
-    bwt = ""
+    # string[-1] is the '$' that ends the string, exactly the character needed for suffix 0
+    return "".join([string[i - 1] for i in suffix_array])
+
+
+def generate_suffix_array(string: str):
+    """
+    generates the suffix array of a string ending in '$' using SA-IS in O(N), without building a trie. The last
+    character is the sentinel and sorts before everything else, whatever the other characters are
+    Args:
+        string: string ending in '$'
+    Returns:
+        the suffix array, as an array('i')
+    """
+
+    if not string or string[-1] != '$':
+        raise ValueError("string must end in the sentinel '$'")
+
+    # the sentinel becomes 0 and every other character its code + 1, so it is unique and smallest even when the
+    # text has spaces, newlines or other '$'
+    text = array('i', [ord(char) + 1 for char in string[:-1]])
+    text.append(0)
+    return sa_is(text, max(text) + 1)
+
+
+def sa_is(text, alphabet_size: int):
+    """
+    SA-IS suffix array construction. Suffixes are typed S (smaller than the next suffix) or L (larger), the
+    leftmost S suffixes of each run (LMS) are sorted by inducing, named, and sorted recursively when their names
+    are not unique. A final induce then sorts every suffix from the sorted LMS suffixes
+    Args:
+        text: sequence of ints in range(alphabet_size), the last one unique and smaller than all the others
+        alphabet_size: number of possible values in text
+    Returns:
+        the suffix array of text, as an array('i')
+    """
+
+    n = len(text)
+    if n == 1:
+        return array('i', [0])
+
+    # s_type[i] is 1 if suffix i is S type, the last suffix (the sentinel) is S type
+    s_type = bytearray(n)
+    s_type[n - 1] = 1
+    for i in range(n - 2, -1, -1):
+        if text[i] < text[i + 1] or (text[i] == text[i + 1] and s_type[i + 1]):
+            s_type[i] = 1
+
+    lms_positions = array('i', [i for i in range(1, n) if s_type[i] and not s_type[i - 1]])
+
+    # number of suffixes in each character's bucket
+    counts = [0] * alphabet_size
+    for char in text:
+        counts[char] += 1
+
+    suffix_array = induce_sort(text, s_type, counts, lms_positions)
+
+    # name the LMS substrings in sorted order, equal substrings get the same name
+    is_lms = bytearray(n)
+    for i in lms_positions:
+        is_lms[i] = 1
+    names = array('i', [-1]) * n
+    name = -1
+    prev = -1
     for i in suffix_array:
+        if is_lms[i]:
+            if prev == -1 or not lms_substrings_equal(text, s_type, is_lms, prev, i):
+                name += 1
+            names[i] = name
+            prev = i
+
+    # sort the LMS suffixes, recursing on the string of names if two LMS substrings were equal
+    if name + 1 == len(lms_positions):
+        sorted_lms = array('i', [i for i in suffix_array if is_lms[i]])
+    else:
+        reduced = array('i', [names[i] for i in lms_positions])
+        reduced_suffix_array = sa_is(reduced, name + 1)
+        sorted_lms = array('i', [lms_positions[i] for i in reduced_suffix_array])
+
+    return induce_sort(text, s_type, counts, sorted_lms)
+
+
+def induce_sort(text, s_type: bytearray, counts: list, lms_positions):
+    """
+    places the LMS suffixes at the ends of their buckets, keeping their order, then induces the L type suffixes
+    left to right and the S type suffixes right to left
+    Args:
+        text: sequence of ints
+        s_type: type of every suffix, 1 for S type
+        counts: number of suffixes in each character's bucket
+        lms_positions: the LMS suffixes to place
+    Returns:
+        the induced suffix array, as an array('i')
+    """
+
+    n = len(text)
+    suffix_array = array('i', [-1]) * n
+
+    # bucket ends, filled from the back so lms_positions keeps its order
+    tails = []
+    total = 0
+    for count in counts:
+        total += count
+        tails.append(total)
+    for k in range(len(lms_positions) - 1, -1, -1):
+        i = lms_positions[k]
+        tails[text[i]] -= 1
+        suffix_array[tails[text[i]]] = i
+
+    # L type suffixes from the bucket heads, left to right
+    heads = []
+    total = 0
+    for count in counts:
+        heads.append(total)
+        total += count
+    for k in range(n):
+        j = suffix_array[k] - 1
+        if j >= 0 and not s_type[j]:
+            suffix_array[heads[text[j]]] = j
+            heads[text[j]] += 1
+
+    # S type suffixes from the bucket tails, right to left
+    tails = []
+    total = 0
+    for count in counts:
+        total += count
+        tails.append(total)
+    for k in range(n - 1, -1, -1):
+        j = suffix_array[k] - 1
+        if j >= 0 and s_type[j]:
+            tails[text[j]] -= 1
+            suffix_array[tails[text[j]]] = j
+
+    return suffix_array
+
+
+def lms_substrings_equal(text, s_type: bytearray, is_lms: bytearray, a: int, b: int):
+    """
+    checks if the LMS substrings starting at a and b, up to and including the next LMS position, are the same
+    Args:
+        text: sequence of ints
+        s_type: type of every suffix, 1 for S type
+        is_lms: 1 at every LMS position
+        a: start of the first LMS substring
+        b: start of the second LMS substring
+    Returns:
+        True if the substrings are equal
+    """
+
+    # the sentinel is unique, so its LMS substring is only equal to itself
+    n = len(text)
+    if a == n - 1 or b == n - 1:
+        return a == b
+
+    k = 0
+    while True:
+        if text[a + k] != text[b + k] or s_type[a + k] != s_type[b + k]:
+            return False
+        if k > 0 and (is_lms[a + k] or is_lms[b + k]):
+            return is_lms[a + k] and is_lms[b + k]
+        k += 1
+
+
+def block_bwt(file_path: str, block_size=BLOCK_SIZE, workers=None, storage="sais",
+              output_path="output_genbwt.bwb"):
+    """
+    bzip2 style block mode, the input is split into blocks of block_size characters that are transformed
+    independently in a process pool and written to a container laid out as described at BLOCK_BWT_MAGIC. At most
+    one block per worker is in flight, so memory is bounded by block_size times workers however large the input
+    is
+
+    Args:
+        file_path: file path with string to convert into bwt
+        block_size: number of input characters per block
+        workers: number of processes to use, defaults to the number of cpus
+        storage: "sais" to build each suffix array with SA-IS, "arrays" to build each one from an ArrayTree
+        output_path: path to write the container to
+
+    Returns:
+        none
+    """
+
+    if storage not in ("sais", "arrays"):
+        raise ValueError("Unsupported storage: {}".format(storage))
+    if workers is None:
+        workers = os.cpu_count() or 1
+    n = os.path.getsize(file_path)
+    n_blocks = -(-n // block_size)
+
+    with open(file_path, 'rb') as text_file, open(output_path, 'wb') as file:
+        file.write(BLOCK_BWT_HEADER.pack(BLOCK_BWT_MAGIC, BLOCK_BWT_VERSION, 0, block_size, n, n_blocks))
+        # the sentinel rows are only known once the blocks are transformed, the index is filled in at the end
+        file.write(bytes(BLOCK_INDEX_ENTRY.size * n_blocks))
+        sentinel_rows = []
+
+        with Pool(workers) as pool:
+            pending = deque()
+            for block in iter(lambda: text_file.read(block_size), b""):
+                pending.append(pool.apply_async(transform_block, (block, storage)))
+                # wait for the oldest block before reading more, blocks are written in input order
+                if len(pending) == workers:
+                    sentinel_row, bwt = pending.popleft().get()
+                    sentinel_rows.append(sentinel_row)
+                    file.write(bwt)
+            while pending:
+                sentinel_row, bwt = pending.popleft().get()
+                sentinel_rows.append(sentinel_row)
+                file.write(bwt)
+
+        # every block bwt is as long as its block
+        file.seek(BLOCK_BWT_HEADER.size)
+        offset = BLOCK_BWT_HEADER.size + BLOCK_INDEX_ENTRY.size * n_blocks
+        for start, sentinel_row in zip(range(0, n, block_size), sentinel_rows):
+            length = min(block_size, n - start)
+            file.write(BLOCK_INDEX_ENTRY.pack(offset, length, sentinel_row))
+            offset += length
+    print(f"Successfully wrote {n_blocks} blocks to '{output_path}'.")
+
+
+def transform_block(block: bytes, storage: str):
+    """
+    computes the bwt of one block with its own sentinel, run in the worker processes of block_bwt. The sentinel is
+    code 0 and every byte is shifted up by 1, so it is unique and smallest whatever the block contains. Like
+    bzip2, the sentinel is left out of the bwt and its row is returned instead
+    Args:
+        block: the block of input
+        storage: "sais" or "arrays", see block_bwt
+
+    Returns:
+        the row of the sentinel and the bwt of the block as bytes, as long as the block
+    """
+
+    text = array('i', [char + 1 for char in block])
+    text.append(0)
+    if storage == "arrays":
+        suffix_array = generate_trie_arrays(text, len(text)).iter_suffix_array()
+    else:
+        suffix_array = sa_is(text, 257)
+
+    bwt = bytearray()
+    sentinel_row = 0
+    for row, i in enumerate(suffix_array):
         if i == 0:
-            bwt += '$'
+            sentinel_row = row
         else:
-            bwt += string[i - 1]
+            bwt.append(block[i - 1])
+    return sentinel_row, bytes(bwt)
+
+
+def save_suffix_tree(file_path: str, suffix_tree):
+    """
+    writes a SuffixTree or GeneralizedSuffixTree to a single binary file, laid out as described at
+    SUFFIX_TREE_MAGIC, so load_suffix_tree can memory map it instead of building the tree again
+    Args:
+        file_path: path to write the tree to
+        suffix_tree: the tree
+
+    Returns:
+        None
+    """
+
+    tree = suffix_tree.tree
+    generalized = isinstance(suffix_tree, GeneralizedSuffixTree)
+    doc_starts = array('i')
+    if generalized:
+        kind = 1
+        text = array('i', tree.string)
+        doc_starts = suffix_tree.doc_starts
+    else:
+        try:
+            kind = 0
+            text = tree.string.encode('latin-1')
+        except UnicodeEncodeError:
+            # characters past U+00FF need 4 bytes each, UTF-32 stores every character as its int32 code
+            kind = 2
+            text = tree.string.encode('utf-32-le')
+
+    sections = [text, tree.start, tree.end, tree.first_child, tree.next_sibling, tree.link, suffix_tree.depth,
+                suffix_tree.leaf_count]
+    if generalized:
+        sections += [doc_starts, suffix_tree.leaf_doc]
+
+    with open(file_path, 'wb') as file:
+        file.write(SUFFIX_TREE_HEADER.pack(SUFFIX_TREE_MAGIC, SUFFIX_TREE_VERSION, kind, len(tree.start),
+                                           len(tree.string), len(doc_starts)))
+        for section in sections:
+            data = bytes(section) if isinstance(section, bytes) else to_little_endian(array('i', section))
+            file.write(data)
+            # pad every section to a multiple of 8 bytes
+            file.write(bytes(-len(data) % 8))
+    print(f"Successfully wrote suffix tree to '{file_path}'.")
+
+
+def load_suffix_tree(file_path: str):
+    """
+    memory maps a tree written by save_suffix_tree. The node arrays are memoryviews straight into the file, so no
+    Python object is made per node and pages are only read as queries touch them. For a SuffixTree the text is
+    decoded back into one str. The file stays mapped until the tree's close is called
+    Args:
+        file_path: path of the tree
+
+    Returns:
+        a SuffixTree or GeneralizedSuffixTree
+    """
+
+    with open(file_path, 'rb') as file:
+        data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, version, kind, n_nodes, n, n_docs = SUFFIX_TREE_HEADER.unpack_from(data, 0)
+    if magic != SUFFIX_TREE_MAGIC or version != SUFFIX_TREE_VERSION:
+        data.close()
+        raise ValueError("{} is not a version {} suffix tree".format(file_path, SUFFIX_TREE_VERSION))
+
+    view = memoryview(data)
+    offset = SUFFIX_TREE_HEADER.size
+    if kind == 1:
+        text = int32_view(view, offset, n)
+        offset += 4 * n + (-4 * n % 8)
+    elif kind == 2:
+        text = str(view[offset:offset + 4 * n], 'utf-32-le')
+        offset += 4 * n + (-4 * n % 8)
+    else:
+        text = str(view[offset:offset + n], 'latin-1')
+        offset += n + (-n % 8)
+
+    node_arrays = []
+    for _ in range(7):
+        node_arrays.append(int32_view(view, offset, n_nodes))
+        offset += 4 * n_nodes + (-4 * n_nodes % 8)
+    start, end, first_child, next_sibling, link, depth, leaf_count = node_arrays
+    arrays = (start, end, first_child, next_sibling, link)
+
+    if kind != 1:
+        suffix_tree = SuffixTree(ArrayTree(text, arrays), depth, leaf_count)
+    else:
+        doc_starts = int32_view(view, offset, n_docs)
+        offset += 4 * n_docs + (-4 * n_docs % 8)
+        leaf_doc = int32_view(view, offset, n_nodes)
+        suffix_tree = GeneralizedSuffixTree(GeneralizedArrayTree(text, arrays), doc_starts, depth, leaf_count,
+                                            leaf_doc)
+    suffix_tree.data = data
+    return suffix_tree
+
+
+def to_little_endian(values: array):
+    """
+    converts an array to little endian bytes
+    Args:
+        values: the array
+
+    Returns:
+        the bytes
+    """
+
+    if sys.byteorder != 'little':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def int32_view(view: memoryview, offset: int, count: int):
+    """
+    reads count little endian int32 values from a memoryview without copying them
+    Args:
+        view: memoryview of the file
+        offset: position of the first value
+        count: number of values
+
+    Returns:
+        a memoryview of the values, byte swapped into a copy on big endian machines
+    """
+
+    values = view[offset:offset + 4 * count]
+    if sys.byteorder == 'little':
+        return values.cast('i')
+    swapped = array('i', values.tobytes())
+    swapped.byteswap()
+    return memoryview(swapped)
+
+
+def kasai(string: str, suffix_array):
+    """
+    Kasai's algorithm, computes the LCP array from the suffix array in O(N). Suffixes are visited in text order,
+    and the common prefix with the previous suffix in sorted order shrinks by at most one from one to the next, so
+    h only goes down n times in total
+    Args:
+        string: string the suffix array was made from
+        suffix_array: its suffix array
+
+    Returns:
+        array('I'), lcp[i] is the length of the longest common prefix of the suffixes at suffix_array[i - 1] and
+        suffix_array[i], lcp[0] is 0
+    """
+
+    n = len(string)
+    rank = array('I', bytes(4 * n))
+    for i in range(n):
+        rank[suffix_array[i]] = i
+
+    lcp = array('I', bytes(4 * n))
+    h = 0
+    for i in range(n):
+        if rank[i] == 0:
+            h = 0
+            continue
+        j = suffix_array[rank[i] - 1]
+        while i + h < n and j + h < n and string[i + h] == string[j + h]:
+            h += 1
+        lcp[rank[i]] = h
+        if h > 0:
+            h -= 1
+    return lcp
+
+
+def write_lcp_array(file_path: str, lcp: array):
+    """
+    writes the LCP array as raw little endian uint32, so read_lcp_array only has to copy it into an array
+    Args:
+        file_path: path to write the LCP array to
+        lcp: array('I') from kasai
+
+    Returns:
+        None
+    """
+
+    if sys.byteorder != 'little':
+        lcp = array('I', lcp)
+        lcp.byteswap()
+    with open(file_path, 'wb') as file:
+        lcp.tofile(file)
+    print(f"Successfully wrote LCP array to '{file_path}'.")
+
+
+def read_lcp_array(file_path: str):
+    """
+    reads an LCP array written by write_lcp_array, without parsing
+    Args:
+        file_path: path of the LCP array
+
+    Returns:
+        array('I')
+    """
+
+    lcp = array('I')
+    with open(file_path, 'rb') as file:
+        lcp.frombytes(file.read())
+    if sys.byteorder != 'little':
+        lcp.byteswap()
+    return lcp
+
+
+def write_fm_index(file_path: str, bwt: str, suffix_array, checkpoint_interval=CHECKPOINT_INTERVAL,
+                   sa_sample_rate=SA_SAMPLE_RATE):
+    """
+    writes the bwt with everything needed to search it (C array, occurrence checkpoints and a sampled suffix
+    array) to a single binary file, laid out as described at FM_INDEX_MAGIC, so it can be memory mapped and used
+    straight away by hdbwtpm.py
+    Args:
+        file_path: path to write the index to
+        bwt: bwt string
+        suffix_array: suffix array the bwt was made from
+        checkpoint_interval: number of bwt characters between occurrence checkpoints
+        sa_sample_rate: every sa_sample_rate-th suffix array entry is kept
+    Returns:
+        None
+    """
+
+    # the index stores one byte per character
+    if bwt and max(bwt) > '\xff':
+        raise ValueError("FM-index supports only Latin-1 text, the bwt contains {!r}".format(max(bwt)))
+    data = bwt.encode('latin-1')
+    n = len(data)
+    if n >= 1 << 32:
+        raise ValueError("FM-index files only support up to 2^32 - 1 characters, got {}".format(n))
+
+    # C array, characters smaller than each character of the alphabet
+    counts = [0] * 256
+    for char in data:
+        counts[char] += 1
+    # the sentinel sorts before every character, even ones below '$' such as spaces and newlines
+    alphabet = bytes(sorted((char for char in range(256) if counts[char]), key=lambda char: (char != ord('$'), char)))
+    column = [0] * 256
+    for i in range(len(alphabet)):
+        column[alphabet[i]] = i
+    c_array = array('I')
+    total = 0
+    for char in alphabet:
+        c_array.append(total)
+        total += counts[char]
+
+    # checkpoint rows, counts of each alphabet character before every multiple of checkpoint_interval
+    checkpoints = array('I')
+    row = [0] * len(alphabet)
+    for i in range(n):
+        if i % checkpoint_interval == 0:
+            checkpoints.extend(row)
+        row[column[data[i]]] += 1
+    if n % checkpoint_interval == 0:
+        checkpoints.extend(row)
+
+    samples = array('I', suffix_array[::sa_sample_rate])
+
+    with open(file_path, 'wb') as file:
+        file.write(FM_INDEX_HEADER.pack(FM_INDEX_MAGIC, FM_INDEX_VERSION, 0, n, len(alphabet),
+                                        checkpoint_interval, sa_sample_rate))
+        for section in (alphabet, to_little_endian(c_array), data, to_little_endian(checkpoints),
+                        to_little_endian(samples)):
+            file.write(section)
+            # pad every section to a multiple of 8 bytes
+            file.write(bytes(-len(section) % 8))
+    print(f"Successfully wrote FM-index to '{file_path}'.")
+
+
+class ConstructionStats:
+    def __init__(self, storage: str, n: int):
+        """
+        Counters filled in by generate_trie and generate_trie_arrays when ukkonen is asked for a profile
+        Args:
+            storage: storage the trie was built with
+            n: length of the string, including the '$'
+        """
+
+        self.storage = storage
+        self.n = n
+        # Node objects for the object trie, whose leaves are only edges, ArrayTree nodes including leaves for arrays
+        self.nodes_created = 0
+        self.edges_created = 0
+        self.suffix_link_jumps = 0
+        self.rule_3_exits = 0
+        # moves down to a child node while walking to the end of the active point
+        self.skip_count_steps = 0
+        # string slices made by the object trie, and the size of the str objects they allocated
+        self.slices = 0
+        self.slice_bytes = 0
+        # filled in by ukkonen, the construction is timed under tracemalloc so seconds is inflated
+        self.seconds = 0.0
+        self.peak_bytes = 0
+
+    def to_dict(self):
+        """
+        Returns: the counters as a dict, with every count also divided by n so inputs can be compared
+        """
+
+        counts = {
+            "nodes_created": self.nodes_created,
+            "edges_created": self.edges_created,
+            "suffix_link_jumps": self.suffix_link_jumps,
+            "rule_3_exits": self.rule_3_exits,
+            "skip_count_steps": self.skip_count_steps,
+            "slices": self.slices,
+            "slice_bytes": self.slice_bytes,
+            "peak_bytes": self.peak_bytes,
+        }
+        return {
+            "storage": self.storage,
+            "n": self.n,
+            "seconds": self.seconds,
+            **counts,
+            "per_char": {name: count / self.n for name, count in counts.items()},
+        }
+
+    def dump(self, output_filename: str):
+        """
+        writes the counters to a file as json
+        Args:
+            output_filename: the name of the file where the counters have to be output
+
+        Returns:
+            None
+        """
 
-    return bwt
+        with open(output_filename, "w") as file:
+            json.dump(self.to_dict(), file, indent=2)
+        print("Stats written to: " + output_filename)
 
 
 class Node:
+    __slots__ = ("is_root", "parent_edge", "link", "edges")
+
     def __init__(self, is_root: bool, parent_edge=None, link=None):
         """
         Initializes Node class. Cases for root and non-root nodes
@@ -245,21 +1098,32 @@ class Node:
 
     def get_suffix_array(self):
         """
-        generates suffix array using recursion through connected nodes and edges using DFS in O(N) time
+        generates suffix array using DFS through connected nodes and edges in O(N) time
         Returns: a suffix array, list of numbers
         """
 
-        ret_val = []
-        for i in self.edges:
-            if i is not None:
-                if i.is_leaf:
-                    ret_val.append(i.id)
-                else:
-                    ret_val += i.child.get_suffix_array()
-        return ret_val
+        return list(self.iter_suffix_array())
+
+    def iter_suffix_array(self):
+        """
+        DFS through connected nodes and edges with an explicit stack, so deep tries (long repeats) do not hit the
+        recursion limit and no lists are concatenated along the way
+        Returns: yields the suffix array one suffix id at a time
+        """
+
+        # edges are pushed in reverse order so the smallest character is visited first
+        stack = [edge for edge in reversed(self.edges) if edge is not None]
+        while stack:
+            edge = stack.pop()
+            if edge.is_leaf:
+                yield edge.id
+            else:
+                stack.extend(child_edge for child_edge in reversed(edge.child.edges) if child_edge is not None)
 
 
 class Edge:
+    __slots__ = ("parent", "edge_rep", "child", "is_leaf", "id")
+
     def __init__(self, parent, edge_rep: tuple, suffix_id):
         """
         initialize Edge Class
@@ -277,6 +1141,8 @@ class Edge:
 
 
 class GlobalEnd:
+    __slots__ = ("global_end",)
+
     def __init__(self):
         """
         Initializes the global end class
@@ -323,6 +1189,550 @@ class GlobalEnd:
         return self.global_end
 
 
+class ArrayTree:
+    __slots__ = ("string", "start", "end", "first_child", "next_sibling", "link")
+
+    def __init__(self, string: str, arrays=None):
+        """
+        Suffix trie stored as parallel arrays indexed by node, the root is node 0. Every other node holds the
+        edge leading into it as string[start:end], end is -1 for leaves (the global end). Children form a
+        linked list through first_child and next_sibling. link is the suffix link of internal nodes and the
+        suffix id of leaves, so a node costs 5 ints (20 bytes) instead of a Node, an Edge and a 91 slot list
+        Args:
+            string: the string the trie is built from
+            arrays: (start, end, first_child, next_sibling, link) of an existing trie, by default the trie only
+                has a root
+        """
+
+        self.string = string
+        if arrays is None:
+            arrays = (array('i', [0]), array('i', [0]), array('i', [-1]), array('i', [-1]), array('i', [0]))
+        self.start, self.end, self.first_child, self.next_sibling, self.link = arrays
+
+    def add_node(self, parent: int, start: int, end: int, link: int):
+        """
+        adds a node as the first child of parent
+        Args:
+            parent: parent node
+            start: start of the edge into the node
+            end: end of the edge into the node, -1 for a leaf
+            link: suffix link, or suffix id for a leaf
+
+        Returns:
+            the new node
+        """
+
+        node = len(self.start)
+        self.start.append(start)
+        self.end.append(end)
+        self.first_child.append(-1)
+        self.next_sibling.append(self.first_child[parent])
+        self.link.append(link)
+        self.first_child[parent] = node
+        return node
+
+    def find_child(self, node: int, char: str):
+        """
+        finds the child of node whose edge starts with char
+        Args:
+            node: parent node
+            char: first character of the edge
+
+        Returns:
+            the child, or -1 if there is none
+        """
+
+        string = self.string
+        start = self.start
+        next_sibling = self.next_sibling
+        child = self.first_child[node]
+        while child != -1 and string[start[child]] != char:
+            child = next_sibling[child]
+        return child
+
+    def split_edge(self, parent: int, child: int, length: int):
+        """
+        splits the edge into child after length characters, the new internal node takes child's place among
+        parent's children and child becomes its only child
+        Args:
+            parent: parent node
+            child: child node
+            length: number of characters of the edge above the split
+
+        Returns:
+            the new internal node
+        """
+
+        start = self.start
+        next_sibling = self.next_sibling
+
+        split = len(start)
+        start.append(start[child])
+        self.end.append(start[child] + length)
+        self.first_child.append(child)
+        next_sibling.append(next_sibling[child])
+        self.link.append(0)
+
+        # replace child with split in the list of parent's children
+        if self.first_child[parent] == child:
+            self.first_child[parent] = split
+        else:
+            prev = self.first_child[parent]
+            while next_sibling[prev] != child:
+                prev = next_sibling[prev]
+            next_sibling[prev] = split
+
+        start[child] += length
+        next_sibling[child] = -1
+        return split
+
+    def get_suffix_array(self):
+        """
+        generates suffix array with an iterative DFS that visits children in order of their first character
+        Returns: a suffix array, list of numbers
+        """
+
+        return list(self.iter_suffix_array())
+
+    def iter_suffix_array(self):
+        """
+        same DFS as get_suffix_array, yielding suffix ids as the leaves are reached
+        Returns: yields the suffix array one suffix id at a time
+        """
+
+        string = self.string
+        start = self.start
+        end = self.end
+        first_child = self.first_child
+        next_sibling = self.next_sibling
+        link = self.link
+
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            if end[node] == -1:
+                yield link[node]
+                continue
+            children = []
+            child = first_child[node]
+            while child != -1:
+                children.append(child)
+                child = next_sibling[child]
+            # push in reverse order so the smallest character is visited first
+            children.sort(key=lambda c: string[start[c]], reverse=True)
+            stack.extend(children)
+
+
+class GeneralizedArrayTree(ArrayTree):
+    __slots__ = ()
+
+    def add_node(self, parent: int, start: int, end: int, link: int):
+        """
+        same as ArrayTree.add_node, except that leaves whose edge starts with a terminator go after all the other
+        children. A node can have a terminator leaf for every document, this keeps them out of the way of
+        find_child and split_edge
+        Args:
+            parent: parent node
+            start: start of the edge into the node
+            end: end of the edge into the node, -1 for a leaf
+            link: suffix link, or suffix id for a leaf
+
+        Returns:
+            the new node
+        """
+
+        string = self.string
+        first_child = self.first_child
+        next_sibling = self.next_sibling
+        prev = first_child[parent]
+        if string[start] >= 0 or prev == -1 or string[self.start[prev]] < 0:
+            return super().add_node(parent, start, end, link)
+
+        # insert after the last child that does not start with a terminator
+        while next_sibling[prev] != -1 and string[self.start[next_sibling[prev]]] >= 0:
+            prev = next_sibling[prev]
+        node = len(self.start)
+        self.start.append(start)
+        self.end.append(end)
+        first_child.append(-1)
+        next_sibling.append(next_sibling[prev])
+        self.link.append(link)
+        next_sibling[prev] = node
+        return node
+
+    def find_child(self, node: int, char: int):
+        """
+        same as ArrayTree.find_child, stopping at the first terminator leaf. Terminators are unique so there is
+        never an edge to find for one
+        Args:
+            node: parent node
+            char: first character code of the edge
+
+        Returns:
+            the child, or -1 if there is none
+        """
+
+        if char < 0:
+            return -1
+        string = self.string
+        start = self.start
+        next_sibling = self.next_sibling
+        child = self.first_child[node]
+        while child != -1 and string[start[child]] != char:
+            if string[start[child]] < 0:
+                return -1
+            child = next_sibling[child]
+        return child
+
+
+class SuffixTree:
+    __slots__ = ("tree", "leaf_count", "depth", "data")
+
+    def __init__(self, tree: ArrayTree, depth=None, leaf_count=None):
+        """
+        Query layer over an ArrayTree built by generate_trie_arrays. One DFS computes the string depth of every
+        node and, in post-order, the number of leaves below it, so count never has to walk a subtree
+        Args:
+            tree: the ArrayTree
+            depth: string depth of every node, if it is already known
+            leaf_count: number of leaves below every node, if it is already known
+        """
+
+        self.tree = tree
+        # the memory mapped file, set by load_suffix_tree
+        self.data = None
+        if depth is not None and leaf_count is not None:
+            self.depth = depth
+            self.leaf_count = leaf_count
+            return
+
+        n = len(tree.start)
+        n_chars = len(tree.string)
+        start = tree.start
+        end = tree.end
+        first_child = tree.first_child
+        next_sibling = tree.next_sibling
+
+        self.depth = array('i', [0]) * n
+        self.leaf_count = array('i', [0]) * n
+        parent = array('i', [-1]) * n
+        order = []
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            order.append(node)
+            child = first_child[node]
+            while child != -1:
+                parent[child] = node
+                edge_end = end[child] if end[child] != -1 else n_chars
+                self.depth[child] = self.depth[node] + edge_end - start[child]
+                stack.append(child)
+                child = next_sibling[child]
+
+        # every child comes after its parent in order, so walking it backwards is a post-order pass
+        leaf_count = self.leaf_count
+        for node in reversed(order):
+            if end[node] == -1:
+                leaf_count[node] = 1
+            if node != 0:
+                leaf_count[parent[node]] += leaf_count[node]
+
+    def encode(self, pattern: str):
+        """
+        converts pattern to the representation of the tree's string
+        Args:
+            pattern: the pattern
+
+        Returns:
+            pattern, unchanged for a tree over a str
+        """
+
+        return pattern
+
+    def decode(self, start: int, end: int):
+        """
+        reads part of the tree's string back as a str
+        Args:
+            start: first position
+            end: position after the last one
+
+        Returns:
+            the substring
+        """
+
+        return self.tree.string[start:end]
+
+    def find_locus(self, pattern: str):
+        """
+        walks down from the root along pattern, in O(|pattern|)
+        Args:
+            pattern: the pattern
+
+        Returns:
+            the highest node whose path starts with pattern, or -1 if pattern does not occur
+        """
+
+        tree = self.tree
+        text = tree.string
+        n = len(text)
+        codes = self.encode(pattern)
+        node = 0
+        i = 0
+        while i < len(codes):
+            node = tree.find_child(node, codes[i])
+            if node == -1:
+                return -1
+            # leaf edges run to the end of the string, a pattern without the terminator stops matching before it
+            edge_end = tree.end[node] if tree.end[node] != -1 else n
+            length = min(edge_end - tree.start[node], len(codes) - i)
+            if text[tree.start[node]:tree.start[node] + length] != codes[i:i + length]:
+                return -1
+            i += length
+        return node
+
+    def iter_leaves(self, node: int):
+        """
+        iterative DFS over the subtree of node
+        Args:
+            node: root of the subtree
+
+        Returns:
+            yields the leaves of the subtree
+        """
+
+        end = self.tree.end
+        first_child = self.tree.first_child
+        next_sibling = self.tree.next_sibling
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if end[node] == -1:
+                yield node
+                continue
+            child = first_child[node]
+            while child != -1:
+                stack.append(child)
+                child = next_sibling[child]
+
+    def count(self, pattern: str):
+        """
+        counts the occurrences of pattern, in O(|pattern|)
+        Args:
+            pattern: non empty pattern
+
+        Returns:
+            the number of occurrences
+        """
+
+        node = self.find_locus(pattern)
+        return 0 if node == -1 else self.leaf_count[node]
+
+    def locate(self, pattern: str):
+        """
+        finds every occurrence of pattern, in O(|pattern| + occ)
+        Args:
+            pattern: non empty pattern
+
+        Returns:
+            a list of the positions pattern starts at, in the order the DFS reaches them, sort it if needed
+        """
+
+        node = self.find_locus(pattern)
+        if node == -1:
+            return []
+        link = self.tree.link
+        return [link[leaf] for leaf in self.iter_leaves(node)]
+
+    def longest_repeated_substring(self):
+        """
+        the path to the deepest internal node is the longest substring that occurs at least twice
+        Returns:
+            the substring, empty if no character repeats
+        """
+
+        node = self.deepest_node(lambda node: self.tree.end[node] != -1)
+        return self.decode(self.tree.end[node] - self.depth[node], self.tree.end[node])
+
+    def close(self):
+        """
+        releases the memory mapped file of a tree from load_suffix_tree, the tree can not be used afterwards
+        Returns:
+            None
+        """
+
+        if self.data is None:
+            return
+        for values in self.mapped_arrays():
+            if isinstance(values, memoryview):
+                values.release()
+        self.data.close()
+        self.data = None
+
+    def mapped_arrays(self):
+        """
+        Returns: every array that load_suffix_tree may have made a memoryview into the file
+        """
+
+        tree = self.tree
+        return [tree.string, tree.start, tree.end, tree.first_child, tree.next_sibling, tree.link, self.depth,
+                self.leaf_count]
+
+    def deepest_node(self, accept):
+        """
+        finds the node with the largest string depth among the internal nodes accepted
+        Args:
+            accept: function from an internal node to bool
+
+        Returns:
+            the deepest accepted node, the root if there is none
+        """
+
+        end = self.tree.end
+        depth = self.depth
+        best = 0
+        for node in range(1, len(end)):
+            if end[node] != -1 and depth[node] > depth[best] and accept(node):
+                best = node
+        return best
+
+
+class GeneralizedSuffixTree(SuffixTree):
+    __slots__ = ("doc_starts", "leaf_doc")
+
+    def __init__(self, tree: ArrayTree, doc_starts: array, depth=None, leaf_count=None, leaf_doc=None):
+        """
+        A SuffixTree over an ArrayTree built by generate_generalized_trie, with the document of every leaf stored
+        next to it so queries never have to search doc_starts. A leaf's suffix id is its position in the joined
+        text, its offset within the document is the suffix id minus the start of the document
+        Args:
+            tree: the ArrayTree over the joined documents
+            doc_starts: position of the first character of every document in the joined text
+            depth: see SuffixTree
+            leaf_count: see SuffixTree
+            leaf_doc: document of every leaf, if it is already known
+        """
+
+        super().__init__(tree, depth, leaf_count)
+        self.doc_starts = doc_starts
+        if leaf_doc is not None:
+            self.leaf_doc = leaf_doc
+            return
+        # document of every leaf, -1 for internal nodes
+        self.leaf_doc = array('i', [-1]) * len(tree.start)
+        end = tree.end
+        link = tree.link
+        for node in range(1, len(end)):
+            if end[node] == -1:
+                self.leaf_doc[node] = bisect_right(doc_starts, link[node]) - 1
+
+    def encode(self, pattern: str):
+        """
+        converts pattern to character codes, like the joined documents
+        Args:
+            pattern: the pattern
+
+        Returns:
+            array('i') of character codes
+        """
+
+        return array('i', map(ord, pattern))
+
+    def decode(self, start: int, end: int):
+        """
+        reads part of the joined documents back as a str, the range must not contain a terminator
+        Args:
+            start: first position
+            end: position after the last one
+
+        Returns:
+            the substring
+        """
+
+        return "".join(map(chr, self.tree.string[start:end]))
+
+    def mapped_arrays(self):
+        """
+        Returns: every array that load_suffix_tree may have made a memoryview into the file
+        """
+
+        return super().mapped_arrays() + [self.doc_starts, self.leaf_doc]
+
+    def locate(self, pattern: str):
+        """
+        finds every occurrence of pattern in every document, in O(|pattern| + occ)
+        Args:
+            pattern: non empty pattern
+
+        Returns:
+            a list of (doc_id, offset) tuples, in the order the DFS reaches them, sort it if needed
+        """
+
+        node = self.find_locus(pattern)
+        if node == -1:
+            return []
+        link = self.tree.link
+        leaf_doc = self.leaf_doc
+        doc_starts = self.doc_starts
+        return [(leaf_doc[leaf], link[leaf] - doc_starts[leaf_doc[leaf]]) for leaf in self.iter_leaves(node)]
+
+    def documents_containing(self, pattern: str):
+        """
+        finds which documents contain pattern, in O(|pattern| + occ)
+        Args:
+            pattern: non empty pattern
+
+        Returns:
+            a list of doc ids, each once, in the order the DFS reaches them
+        """
+
+        node = self.find_locus(pattern)
+        if node == -1:
+            return []
+        leaf_doc = self.leaf_doc
+        return list(dict.fromkeys(leaf_doc[leaf] for leaf in self.iter_leaves(node)))
+
+    def longest_common_substring(self):
+        """
+        finds the longest substring that occurs in every document, the deepest internal node with a leaf of every
+        document below it. The documents below each node are kept as a bitmask, so this is meant for a handful of
+        documents rather than a whole corpus
+        Returns:
+            the substring, empty if the documents have no character in common
+        """
+
+        tree = self.tree
+        # a lone document is common to itself, it ends on a leaf rather than an internal node
+        if len(self.doc_starts) == 1:
+            return self.decode(self.doc_starts[0], len(tree.string) - 1)
+
+        end = tree.end
+        first_child = tree.first_child
+        next_sibling = tree.next_sibling
+        all_docs = (1 << len(self.doc_starts)) - 1
+
+        masks = [0] * len(end)
+        order = []
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            order.append(node)
+            child = first_child[node]
+            while child != -1:
+                stack.append(child)
+                child = next_sibling[child]
+        for node in reversed(order):
+            if end[node] == -1:
+                masks[node] = 1 << self.leaf_doc[node]
+            else:
+                child = first_child[node]
+                while child != -1:
+                    masks[node] |= masks[child]
+                    child = next_sibling[child]
+
+        node = self.deepest_node(lambda node: masks[node] == all_docs)
+        return self.decode(end[node] - self.depth[node], end[node])
+
+
 def read_file_as_string(file_path):
     """
     reads file and converts to string
@@ -362,8 +1772,29 @@ def write_string_to_file(file_path, content, append=False):
 
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python your_script.py file_path")
+    flags = sys.argv[2:]
+    index = "output_genbwt.fmi" if "--index" in flags else None
+    lcp = "output_genbwt.lcp" if "--lcp" in flags else None
+    tree = "output_genbwt.st" if "--tree" in flags else None
+    stats = "stats_genbwt.json" if "--stats" in flags else None
+    engine_flags = [flag for flag in flags if flag not in ("--index", "--lcp", "--tree", "--stats")]
+    engines = ("--arrays", "--sais", "--blocks")
+    if len(sys.argv) < 2 or len(engine_flags) > 1 or (engine_flags and engine_flags[0] not in engines):
+        print("Usage: python your_script.py file_path [--arrays | --sais | --blocks] [--index] [--lcp] [--tree] "
+              "[--stats]")
+    elif tree is not None and engine_flags != ["--arrays"]:
+        print("--tree needs --arrays")
+    elif stats is not None and engine_flags not in ([], ["--arrays"]):
+        print("--stats is only supported for the ukkonen tries")
+    elif engine_flags == ["--blocks"]:
+        if index is not None or lcp is not None:
+            print("--index and --lcp are not supported with --blocks")
+        else:
+            block_bwt(sys.argv[1])
+    elif engine_flags == ["--sais"]:
+        sais(sys.argv[1], index_path=index, lcp_path=lcp)
+    elif engine_flags == ["--arrays"]:
+        ukkonen(sys.argv[1], storage="arrays", index_path=index, lcp_path=lcp, tree_path=tree, stats_path=stats)
     else:
         filename = sys.argv[1]
-        ukkonen(filename)
+        ukkonen(filename, index_path=index, lcp_path=lcp, stats_path=stats)
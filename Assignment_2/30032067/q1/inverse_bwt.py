@@ -0,0 +1,175 @@
+import struct
+import sys
+from array import array
+from collections import Counter
+
+
+# number of decoded characters collected before they are written out
+BLOCK_SIZE = 1 << 16
+
+# block bwt container layout, must match genbwt.py
+BLOCK_BWT_MAGIC = b"BWB1"
+BLOCK_BWT_VERSION = 2
+BLOCK_BWT_HEADER = struct.Struct("<4sHHQQI")
+BLOCK_INDEX_ENTRY = struct.Struct("<QII")
+
+
+def inverse_bwt(bwt_filepath: str, output_path="output_inverse_bwt.txt", block_size=BLOCK_SIZE):
+    """
+    Reconstructs the text from a bwt written by genbwt.py, the sentinel '$' is not written. The text is decoded
+    front to back and written in blocks, so it is never held in memory as a string. Block containers written by
+    genbwt.py --blocks are decoded one block at a time. A plain bwt is read as text, the way genbwt.py wrote it,
+    so characters outside ASCII are decoded as whole characters rather than byte by byte
+    Args:
+        bwt_filepath: path containing bwt processed string, or a block bwt container
+        output_path: path to write the text to
+        block_size: number of characters written at a time
+
+    Returns:
+        None
+    """
+
+    with open(bwt_filepath, 'rb') as bwt_file:
+        is_container = bwt_file.read(len(BLOCK_BWT_MAGIC)) == BLOCK_BWT_MAGIC
+
+    n = 0
+    if is_container:
+        with open(bwt_filepath, 'rb') as bwt_file, open(output_path, 'wb') as file:
+            for block in iter_block_container(bwt_file, block_size):
+                file.write(block)
+                n += len(block)
+    else:
+        with open(bwt_filepath, 'r', newline='') as bwt_file:
+            bwt = bwt_file.read()
+        with open(output_path, 'w', newline='') as file:
+            for block in iter_inverse_bwt(bwt, block_size):
+                file.write(block)
+                n += len(block)
+    print(f"Successfully wrote {n} characters to '{output_path}'.")
+
+
+def iter_block_container(file, block_size=BLOCK_SIZE):
+    """
+    decodes every block of a block bwt container in order, only one block bwt is read at a time
+    Args:
+        file: the container, opened in binary mode
+        block_size: number of characters per output block
+
+    Returns:
+        a generator of bytearray blocks of the text
+    """
+
+    file.seek(0)
+    magic, version, _, _, _, n_blocks = BLOCK_BWT_HEADER.unpack(file.read(BLOCK_BWT_HEADER.size))
+    if magic != BLOCK_BWT_MAGIC or version != BLOCK_BWT_VERSION:
+        raise ValueError("not a version {} block bwt container".format(BLOCK_BWT_VERSION))
+    index = [BLOCK_INDEX_ENTRY.unpack(file.read(BLOCK_INDEX_ENTRY.size)) for _ in range(n_blocks)]
+
+    for offset, length, sentinel_row in index:
+        file.seek(offset)
+        bwt = file.read(length)
+        # put a placeholder back in the sentinel's row, get_first_to_last never counts that row's byte
+        yield from iter_inverse_bwt(bwt[:sentinel_row] + b"\0" + bwt[sentinel_row:], block_size, sentinel_row)
+
+
+def iter_inverse_bwt(bwt, block_size=BLOCK_SIZE, sentinel_row=None):
+    """
+    walks the text forwards from the row that ends with the sentinel, in O(n) time and 4n bytes on top of the bwt.
+    The sentinel sorts before every other character, whatever byte stands in for it
+    Args:
+        bwt: bwt as bytes, or as a str when it may hold any character
+        block_size: number of characters per block
+        sentinel_row: row of the sentinel in bwt, by default the position of its only '$'
+
+    Returns:
+        a generator of blocks of the text, without the sentinel, bytearray for a bytes bwt and str for a str bwt
+    """
+
+    is_text = isinstance(bwt, str)
+    sentinel = '$' if is_text else b'$'
+    if sentinel_row is None:
+        if bwt.count(sentinel) != 1:
+            raise ValueError("bwt must contain exactly one '$'")
+        sentinel_row = bwt.index(sentinel)
+
+    order = get_first_to_last(bwt, sentinel_row)
+    if is_text:
+        yield from ("".join(block) for block in iter_decoded(bwt, order, block_size, list))
+    else:
+        yield from iter_decoded(bwt, order, block_size, bytearray)
+
+
+def iter_decoded(bwt, order, block_size, new_block):
+    """
+    follows order from the sentinel's row, collecting the decoded characters into blocks
+    Args:
+        bwt: bwt as bytes or str
+        order: first to last mapping from get_first_to_last
+        block_size: number of characters per block
+        new_block: makes an empty block, list or bytearray
+
+    Returns:
+        a generator of blocks of the text, without the sentinel
+    """
+
+    block = new_block()
+    # row order[0] ends with the sentinel, so it is the text itself. Moving from a row to the row that ends with
+    # its first character drops that character from the front, and that character is the last one of the new row
+    row = order[0]
+    for _ in range(len(bwt) - 1):
+        row = order[row]
+        block.append(bwt[row])
+        if len(block) == block_size:
+            yield block
+            block = new_block()
+    if block:
+        yield block
+
+
+def get_first_to_last(bwt, sentinel_row: int):
+    """
+    inverse of the LF mapping, for every row i the row whose last character is the first character of row i.
+    Built with a counting sort, as the k-th occurrence of a character in the last column is its k-th occurrence
+    in the first column. The sentinel is the whole of the first row
+    Args:
+        bwt: bwt as bytes or str
+        sentinel_row: row of the sentinel in bwt
+
+    Returns:
+        array('I') of n row numbers
+    """
+
+    if isinstance(bwt, str):
+        # a str can hold any code point, so only the characters that occur are counted, in code point order
+        counts = Counter(bwt)
+        alphabet = sorted(counts)
+        next_row = {}
+    else:
+        counts = [0] * 256
+        for char in bwt:
+            counts[char] += 1
+        alphabet = range(256)
+        next_row = [0] * 256
+    counts[bwt[sentinel_row]] -= 1
+
+    # next free row in the first column for each character, starts at C[char], after the sentinel's row
+    total = 1
+    for char in alphabet:
+        next_row[char] = total
+        total += counts[char]
+
+    order = array('I', bytes(4 * len(bwt)))
+    order[0] = sentinel_row
+    for rows in (range(sentinel_row), range(sentinel_row + 1, len(bwt))):
+        for i in rows:
+            char = bwt[i]
+            order[next_row[char]] = i
+            next_row[char] += 1
+    return order
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage: python your_script.py bwt_filename")
+    else:
+        inverse_bwt(sys.argv[1])
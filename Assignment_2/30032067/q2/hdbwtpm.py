@@ -1,11 +1,22 @@
+import mmap
+import struct
 import sys
+from array import array
+from collections import Counter
+
+
+# FM-index file layout, must match genbwt.py
+FM_INDEX_MAGIC = b"FMI1"
+FM_INDEX_VERSION = 1
+FM_INDEX_HEADER = struct.Struct("<4sHHQIII")
+CHECKPOINT_INTERVAL = 64
 
 
 def bwt_pattern_matching(bwt_filepath, pat_filepath, distance):
     """
     bwt pattern matching using BWT
     Args:
-        bwt_filepath: path containing bwt processed string
+        bwt_filepath: path containing bwt processed string, or an FM-index written by genbwt.py with --index
         pat_filepath: path containing pattern to match with
         distance: hamming distance
 
@@ -14,13 +25,23 @@ def bwt_pattern_matching(bwt_filepath, pat_filepath, distance):
     """
 
     distance = int(distance)
-    string = read_file_as_string(bwt_filepath)
+    # an FM-index file is memory mapped and used as is, a plain bwt has its index built in memory
+    if is_fm_index_file(bwt_filepath):
+        fm_index = FMIndex.from_file(bwt_filepath)
+    else:
+        fm_index = FMIndex.from_bwt(read_file_as_string(bwt_filepath))
     pattern = read_file_as_string(pat_filepath)
+    # a file index holds bytes, so its characters are ints. Code points past Latin-1 never equal one of them and
+    # can only be matched as mismatches
+    if isinstance(fm_index.alphabet, bytes):
+        pattern = [ord(char) for char in pattern]
     # initialize values, final is the return value
-    n = len(string)
+    n = fm_index.n
     m = len(pattern)
     final = []
-    n_occurrences, rank = compute_rank(string)
+    alphabet = fm_index.alphabet
+    c_array = fm_index.c_array
+    occ = fm_index.occ
 
     def backward_search(pattern_index, sp, en, distance):
         """
@@ -44,72 +65,221 @@ def bwt_pattern_matching(bwt_filepath, pat_filepath, distance):
         elif pattern_index < 0 and distance > 0:
             return 0
 
-        # loop through for every individual character in rank
-        for i in range(len(rank)):
-            sp_copy = sp
-            en_copy = en
-            rank_index = rank[i]
-            # if the character exists
-            if rank[i] is not None:
-                # find new sp and ep values for the character
-                while n_occurrences[i][sp_copy] == 0 and sp_copy > 0:
-                    sp_copy -= 1
-                if string[sp] == chr(i+36):
-                    next_sp = rank_index + n_occurrences[i][sp_copy] - 1
-                else:
-                    next_sp = rank_index + n_occurrences[i][sp_copy]
+        # loop through for every character in the bwt
+        for i in range(len(alphabet)):
+            char = alphabet[i]
+            rank_index = c_array[i]
+            # find new sp and ep values for the character
+            next_sp = rank_index + occ(char, sp - 1)
+            next_en = rank_index + occ(char, en) - 1
 
-                while n_occurrences[i][en_copy] == 0 and en_copy > 0:
-                    en_copy -= 1
-                next_en = rank_index + n_occurrences[i][en_copy] - 1
+            if next_sp > next_en and distance > 0:
+                ret_val += backward_search(pattern_index - 1, 0, n-1, distance-1)
+            elif next_sp > next_en and distance == 0:
+                ret_val += 0
+            else:
+                # for the area that matches successfully, do not decrease distance because it matched
+                if char == pattern[pattern_index]:
+                    ret_val += backward_search(pattern_index - 1, next_sp, next_en, distance)
 
-                if next_sp > next_en and distance > 0:
-                    ret_val += backward_search(pattern_index - 1, 0, n-1, distance-1)
-                elif next_sp > next_en and distance == 0:
-                    ret_val += 0
+                # for the "mismatched area", decrease distance for the next round
                 else:
-                    # for the area that matches successfully, do not decrease distance because it matched
-                    if chr(i + 36) == pattern[pattern_index]:
-                        ret_val += backward_search(pattern_index - 1, next_sp, next_en, distance)
-
-                    # for the "mismatched area", decrease distance for the next round
-                    else:
-                        ret_val += backward_search(pattern_index - 1, next_sp, next_en, distance-1)
+                    ret_val += backward_search(pattern_index - 1, next_sp, next_en, distance-1)
         # return number of matches
         return ret_val
 
     # loop through hamming distance
-    for i in range(distance+1):
-        final.append(backward_search(m-1, 0, n-1, i))
+    try:
+        for i in range(distance+1):
+            final.append(backward_search(m-1, 0, n-1, i))
+    finally:
+        fm_index.close()
 
     write_list_to_file("output_hdbwtpm.txt", final)
 
 
-def compute_rank(bwt_string: str):
+class FMIndex:
+    def __init__(self, data, bwt_offset: int, n: int, alphabet: bytes, c_array, checkpoints,
+                 checkpoint_interval: int, samples, sa_sample_rate: int):
+        """
+        Rank structure over a bwt: the C array plus a row of occurrence counts every checkpoint_interval
+        characters, so occ only has to count the characters since the last checkpoint. Built by from_bwt or
+        from_file, the arrays can be in memory arrays or memoryviews of a memory mapped file
+        Args:
+            data: str or mmap holding the bwt
+            bwt_offset: position of the bwt in data
+            n: length of the bwt
+            alphabet: the distinct characters of the bwt in sorted order, a str for an in memory index and bytes
+                for a file
+            c_array: number of bwt characters smaller than each alphabet character
+            checkpoints: occurrence checkpoint rows, len(alphabet) counts each
+            checkpoint_interval: number of bwt characters between checkpoints
+            samples: every sa_sample_rate-th suffix array entry, None if not available
+            sa_sample_rate: sample rate of samples
+        """
+
+        self.data = data
+        self.bwt_offset = bwt_offset
+        self.n = n
+        self.alphabet = alphabet
+        self.column = {alphabet[i]: i for i in range(len(alphabet))}
+        self.c_array = c_array
+        self.checkpoints = checkpoints
+        self.checkpoint_interval = checkpoint_interval
+        self.samples = samples
+        self.sa_sample_rate = sa_sample_rate
+
+    @classmethod
+    def from_bwt(cls, bwt_string: str, checkpoint_interval=CHECKPOINT_INTERVAL):
+        """
+        builds the index in memory in O(N), in one pass over the bwt. The bwt is kept as a string, so it can hold
+        any character
+        Args:
+            bwt_string: bwt processed string
+            checkpoint_interval: number of bwt characters between checkpoints
+
+        Returns:
+            the FMIndex
+        """
+
+        data = bwt_string
+        counts = Counter(data)
+        # the sentinel sorts before every character, even ones below '$' such as spaces and newlines
+        alphabet = "".join(sorted(counts, key=lambda char: (char != '$', char)))
+
+        c_array = array('I')
+        total = 0
+        for char in alphabet:
+            c_array.append(total)
+            total += counts[char]
+
+        column = {alphabet[i]: i for i in range(len(alphabet))}
+        checkpoints = array('I')
+        row = [0] * len(alphabet)
+        for i in range(len(data)):
+            if i % checkpoint_interval == 0:
+                checkpoints.extend(row)
+            row[column[data[i]]] += 1
+        if len(data) % checkpoint_interval == 0:
+            checkpoints.extend(row)
+
+        return cls(data, 0, len(data), alphabet, c_array, checkpoints, checkpoint_interval, None, 0)
+
+    @classmethod
+    def from_file(cls, file_path: str):
+        """
+        memory maps an FM-index written by genbwt.py, nothing is rebuilt or copied
+        Args:
+            file_path: path of the index
+
+        Returns:
+            the FMIndex
+        """
+
+        with open(file_path, 'rb') as file:
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, _, n, sigma, checkpoint_interval, sa_sample_rate = FM_INDEX_HEADER.unpack_from(data, 0)
+        if magic != FM_INDEX_MAGIC or version != FM_INDEX_VERSION:
+            data.close()
+            raise ValueError("{} is not a version {} FM-index".format(file_path, FM_INDEX_VERSION))
+
+        view = memoryview(data)
+        offset = FM_INDEX_HEADER.size
+        alphabet = bytes(view[offset:offset + sigma])
+        offset += padded(sigma)
+        c_array = uint32_view(view, offset, sigma)
+        offset += padded(4 * sigma)
+        bwt_offset = offset
+        offset += padded(n)
+        n_checkpoints = (n // checkpoint_interval + 1) * sigma
+        checkpoints = uint32_view(view, offset, n_checkpoints)
+        offset += padded(4 * n_checkpoints)
+        samples = uint32_view(view, offset, len(range(0, n, sa_sample_rate)))
+
+        return cls(data, bwt_offset, n, alphabet, c_array, checkpoints, checkpoint_interval, samples,
+                   sa_sample_rate)
+
+    def occ(self, char: int, i: int):
+        """
+        number of times char occurs in bwt[0..i], inclusive
+        Args:
+            char: character, an int for a file index and a str for an in memory one
+            i: last position counted, -1 for none
+
+        Returns:
+            the count
+        """
+
+        end = i + 1
+        row = end // self.checkpoint_interval
+        start = row * self.checkpoint_interval
+        count = self.checkpoints[row * len(self.alphabet) + self.column[char]]
+        if start < end:
+            count += self.data[self.bwt_offset + start:self.bwt_offset + end].count(char)
+        return count
+
+    def close(self):
+        """
+        releases the memory mapped file, if there is one
+        Returns:
+            None
+        """
+
+        if isinstance(self.data, mmap.mmap):
+            for view in (self.c_array, self.checkpoints, self.samples):
+                view.release()
+            self.data.close()
+
+
+def is_fm_index_file(file_path: str):
+    """
+    checks if a file starts with the FM-index magic bytes
+    Args:
+        file_path: the filename and location
+    Returns:
+        True if the file is an FM-index
+    """
+
+    try:
+        with open(file_path, 'rb') as file:
+            return file.read(len(FM_INDEX_MAGIC)) == FM_INDEX_MAGIC
+    except FileNotFoundError:
+        return False
+
+
+def padded(size: int):
+    """
+    rounds a section size up to a multiple of 8 bytes, as written by genbwt.py
+    Args:
+        size: size in bytes
+
+    Returns:
+        the padded size
+    """
+
+    return size + (-size % 8)
+
+
+def uint32_view(view: memoryview, offset: int, count: int):
     """
-    Preprocesses rank and n_occurrence for bwt pattern matching
+    reads count little endian uint32 values from a memoryview without copying them
     Args:
-        bwt_string: bwt processed string
+        view: memoryview of the index file
+        offset: position of the first value
+        count: number of values
 
     Returns:
-        rank and n_occurrence
+        a memoryview of the values, byte swapped into a copy on big endian machines
     """
 
-    n = len(bwt_string)
-    string_sorted = sorted(bwt_string)
-    rank = [None] * 91
-    counter = [0] * 91
-    n_occurrence = [[0] * n for _ in range(91)]
-    for i in range(n):
-        index = ord(string_sorted[i]) - 36
-        if rank[index] is None:
-            rank[index] = i
-
-        index = ord(bwt_string[i]) - 36
-        counter[index] += 1
-        n_occurrence[index][i] = counter[index]
-
-    return n_occurrence, rank
+    values = view[offset:offset + 4 * count]
+    if sys.byteorder == 'little':
+        return values.cast('I')
+    swapped = array('I', values.tobytes())
+    swapped.byteswap()
+    values.release()
+    return memoryview(swapped)
 
 
 def read_file_as_string(file_path):